@@ -0,0 +1,104 @@
+import numpy as np
+
+
+class AdaptiveQuestionnaire:
+    """Picks the next most informative symptom to ask about.
+
+    Conditional symptom frequencies are computed once from the symptoms
+    dataset, so every step is a handful of array operations over a
+    (symptoms x conditions) table instead of a model call.
+    """
+
+    def __init__(self, symptoms_df, label_col="Disease", alpha=1.0):
+        self.symptoms = [col for col in symptoms_df.columns if col != label_col]
+        self.symptom_index = {name: i for i, name in enumerate(self.symptoms)}
+
+        labels = symptoms_df[label_col].astype(str).to_numpy()
+        self.conditions, codes = np.unique(labels, return_inverse=True)
+
+        present = (symptoms_df[self.symptoms].to_numpy() > 0).astype(np.float64)
+        one_hot = np.eye(len(self.conditions))[codes]
+
+        condition_counts = one_hot.sum(axis=0)
+        symptom_counts = present.T @ one_hot
+
+        # Laplace smoothing keeps unseen symptom/condition pairs from zeroing a posterior
+        prior = (condition_counts + alpha) / (len(labels) + alpha * len(self.conditions))
+        self.p_yes = (symptom_counts + alpha) / (condition_counts + 2 * alpha)
+        self.p_no = 1.0 - self.p_yes
+
+        self.log_prior = np.log(prior)
+        self.log_p_yes = np.log(self.p_yes)
+        self.log_p_no = np.log(self.p_no)
+
+        self.initial_gain = self._expected_gain(prior)
+
+    @staticmethod
+    def _entropy(probs):
+        probs = np.clip(probs, 1e-12, 1.0)
+        return -(probs * np.log2(probs)).sum(axis=-1)
+
+    def _expected_gain(self, posterior):
+        """Expected entropy reduction for asking each symptom next."""
+        p_yes = self.p_yes @ posterior
+        p_no = 1.0 - p_yes
+
+        post_yes = self.p_yes * posterior / p_yes[:, None]
+        post_no = self.p_no * posterior / p_no[:, None]
+
+        expected = p_yes * self._entropy(post_yes) + p_no * self._entropy(post_no)
+        return self._entropy(posterior) - expected
+
+    def posterior(self, answers):
+        """Condition probabilities given {symptom_index: bool} answers."""
+        log_post = self.log_prior.copy()
+        yes = [i for i, v in answers.items() if v]
+        no = [i for i, v in answers.items() if not v]
+        if yes:
+            log_post += self.log_p_yes[yes].sum(axis=0)
+        if no:
+            log_post += self.log_p_no[no].sum(axis=0)
+
+        log_post -= log_post.max()
+        post = np.exp(log_post)
+        return post / post.sum()
+
+    def step(self, answers, top_k=3, max_questions=15, confidence=0.9):
+        """Return top-k conditions and the next symptom to ask about.
+
+        ``answers`` maps symptom column names to booleans; names that are not
+        dataset columns are ignored.
+        """
+        indexed = {
+            self.symptom_index[name]: bool(value)
+            for name, value in answers.items()
+            if name in self.symptom_index
+        }
+
+        post = self.posterior(indexed)
+        gain = self.initial_gain if not indexed else self._expected_gain(post)
+        gain = gain.copy()
+        if indexed:
+            gain[list(indexed)] = -np.inf
+
+        order = np.argsort(post)[::-1][:max(1, top_k)]
+        top_conditions = [
+            {"condition": str(self.conditions[i]), "probability": round(float(post[i]), 4)}
+            for i in order
+        ]
+
+        best = int(np.argmax(gain))
+        done = (
+            post[order[0]] >= confidence
+            or len(indexed) >= max_questions
+            or not np.isfinite(gain[best])
+            or gain[best] <= 1e-6
+        )
+
+        return {
+            "top_conditions": top_conditions,
+            "next_symptom": None if done else self.symptoms[best],
+            "expected_information_gain": None if done else round(float(gain[best]), 4),
+            "questions_answered": len(indexed),
+            "done": bool(done),
+        }
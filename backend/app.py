@@ -1,7 +1,10 @@
 import os
 import json
+import time
+import shutil
+import tempfile
 import traceback
-from flask import Flask, request, jsonify, session, Response, make_response
+from flask import Flask, request, jsonify, session, Response, make_response, stream_with_context
 import pandas as pd
 import joblib
 import cv2
@@ -10,12 +13,18 @@ import numpy as np
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 from flask_cors import CORS
+from adaptive_questionnaire import AdaptiveQuestionnaire
+from inference_server import UNAVAILABLE_ERRORS, InferenceClient
+from online_learning import FeedbackLog, start_trainer
+from symptom_inference import FRONTEND_TO_BACKEND, build_symptom_predictor, symptom_vector
+import risk_scoring
 
 # ==========================
 # Paths
 # ==========================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 USER_FILE = os.path.join(BASE_DIR, "users.json")
+FEEDBACK_FILE = os.path.join(BASE_DIR, "feedback_log.jsonl")
 
 # ==========================
 # Flask Configuration
@@ -38,20 +47,49 @@ def load_artifact(*relative_paths):
 # ==========================
 # Load Models
 # ==========================
-try:
-    clf = joblib.load(os.path.join(BASE_DIR, "model.pkl"))
-    le = joblib.load(os.path.join(BASE_DIR, "label_encoder.pkl"))
-    text_model = load_artifact("logistic_regression_model.pkl")
-    vectorizer = load_artifact("tfidf_vectorizer.pkl")
-    print("✅ All models loaded successfully")
-except Exception as e:
-    print(f"⚠️ Error loading models: {e}")
-    print("⚠️ Some features may not work. Continuing startup...")
-    # Set to None so we can check later
+# With INFERENCE_SOCKET set, models live in inference_server.py and this
+# worker only forwards requests to it
+INFERENCE_SOCKET = os.environ.get("INFERENCE_SOCKET")
+inference_client = None
+
+if INFERENCE_SOCKET:
+    inference_client = InferenceClient(INFERENCE_SOCKET)
     clf = None
     le = None
     text_model = None
     vectorizer = None
+    print(f"✅ Using shared inference server at {INFERENCE_SOCKET}")
+else:
+    try:
+        clf = joblib.load(os.path.join(BASE_DIR, "model.pkl"))
+        le = joblib.load(os.path.join(BASE_DIR, "label_encoder.pkl"))
+        text_model = load_artifact("logistic_regression_model.pkl")
+        vectorizer = load_artifact("tfidf_vectorizer.pkl")
+        print("✅ All models loaded successfully")
+    except Exception as e:
+        print(f"⚠️ Error loading models: {e}")
+        print("⚠️ Some features may not work. Continuing startup...")
+        # Set to None so we can check later
+        clf = None
+        le = None
+        text_model = None
+        vectorizer = None
+
+# ==========================
+# Online Learning from Feedback
+# ==========================
+feedback_log = FeedbackLog(FEEDBACK_FILE)
+text_trainer = None
+
+
+def publish_text_model(model):
+    # Plain reference swap: requests already holding the old model finish on it
+    global text_model
+    text_model = model
+
+
+if text_model is not None and vectorizer is not None:
+    text_trainer = start_trainer(text_model, vectorizer, FEEDBACK_FILE, publish_text_model)
 
 # ==========================
 # Gemini API Configuration
@@ -85,10 +123,51 @@ except Exception as e:
     symptoms = []
     symptoms_df = None
 
+# Memo + flattened forest for /predict_symptoms (remote mode keeps it in the server)
+symptom_predictor = None
+if inference_client is None and clf is not None and le is not None and symptoms:
+    try:
+        symptom_predictor = build_symptom_predictor(clf, le, symptoms)
+        # The predictor keeps what it serves from; don't hold the pickled forest too
+        clf = None
+        le = None
+    except Exception as e:
+        print(f"⚠️ Error building symptom predictor: {e}")
+
+try:
+    questionnaire = AdaptiveQuestionnaire(symptoms_df) if symptoms_df is not None else None
+except Exception as e:
+    print(f"⚠️ Error building questionnaire tables: {e}")
+    questionnaire = None
+
 
 # ==========================
 # Utility Functions
 # ==========================
+def is_positive(val):
+    if isinstance(val, bool):
+        return val
+    try:
+        s = str(val).strip().lower()
+    except Exception:
+        return False
+    return s in ("1", "true", "on", "yes")
+
+
+def parse_answer(val):
+    """Questionnaire answer -> True/False, or None when it is neither yes nor no."""
+    if val is None:
+        return None
+    if isinstance(val, bool):
+        return val
+    s = str(val).strip().lower()
+    if s in ("1", "true", "on", "yes"):
+        return True
+    if s in ("0", "false", "off", "no"):
+        return False
+    return None
+
+
 def load_users():
     if not os.path.exists(USER_FILE):
         with open(USER_FILE, "w") as f:
@@ -105,27 +184,87 @@ def save_users(users):
         json.dump(users, f, indent=2)
 
 
+def _gemini_text(response):
+    if response and response.text:
+        print(f"✅ Gemini response received: {response.text[:100]}...")
+        return response.text.strip()
+    else:
+        print(f"⚠️ Empty response from Gemini")
+        if hasattr(response, 'prompt_feedback'):
+            print(f"   Prompt feedback: {response.prompt_feedback}")
+        return None
+
+
 def call_gemini_api(prompt, model_name="gemini-pro"):
     """Helper function to call Gemini API with error handling"""
     try:
         print(f"🤖 Calling Gemini API ({model_name})...")
         model = genai.GenerativeModel(model_name)
         response = model.generate_content(prompt, safety_settings=safety_settings)
-        
-        if response and response.text:
-            print(f"✅ Gemini response received: {response.text[:100]}...")
-            return response.text.strip()
-        else:
-            print(f"⚠️ Empty response from Gemini")
-            if hasattr(response, 'prompt_feedback'):
-                print(f"   Prompt feedback: {response.prompt_feedback}")
-            return None
-            
+        return _gemini_text(response)
+
+    except Exception as e:
+        print(f"⚠️ Gemini API error: {e}")
+        return None
+
+
+async def call_gemini_api_async(prompt, model_name="gemini-pro"):
+    """Awaitable call_gemini_api for the ASGI mode (asgi_app.py)"""
+    try:
+        print(f"🤖 Calling Gemini API async ({model_name})...")
+        model = genai.GenerativeModel(model_name)
+        response = await model.generate_content_async(prompt, safety_settings=safety_settings)
+        return _gemini_text(response)
+
     except Exception as e:
         print(f"⚠️ Gemini API error: {e}")
         return None
 
 
+def symptom_model_ready():
+    # In remote mode a dead server surfaces as UNAVAILABLE_ERRORS from the prediction call
+    return inference_client is not None or symptom_predictor is not None
+
+
+def predict_symptom_condition(ordered_values):
+    """Classify one symptom vector (ordered like `symptoms`)."""
+    if inference_client is not None:
+        return inference_client.predict_symptoms(ordered_values)
+    label, _ = symptom_predictor.predict(ordered_values)
+    return label
+
+
+def symptom_model_status():
+    if inference_client is not None:
+        return inference_client.symptom_model_status()
+    return symptom_predictor.stats() if symptom_predictor is not None else None
+
+
+def predict_text_condition(statement):
+    """Return (label, confidence) from the TF-IDF text model."""
+    if inference_client is not None:
+        return inference_client.predict_text(statement)
+    model = text_model  # same version for both calls even if a swap happens mid-request
+    vector = vectorizer.transform([statement.lower()])
+    text_pred = model.predict(vector)[0]
+    confidence = float(model.predict_proba(vector)[0].max())
+    return text_pred, confidence
+
+
+def feedback_status():
+    if inference_client is not None:
+        return inference_client.feedback_status()
+    return text_trainer.status() if text_trainer is not None else None
+
+
+def load_deepface():
+    """Lazy import DeepFace (or its inference-server stand-in)"""
+    if inference_client is not None:
+        return inference_client.deepface()
+    from deepface import DeepFace
+    return DeepFace
+
+
 # ==========================
 # Auth Routes
 # ==========================
@@ -167,73 +306,38 @@ def logout():
 # ==========================
 # Symptom Prediction
 # ==========================
-@app.route("/predict_symptoms", methods=["POST"])
-def predict_symptoms():
-    try:
-        # Check if models are loaded
-        if clf is None or le is None or not symptoms:
-            return jsonify({
-                "error": "Models not loaded. Please check server logs.",
-                "prediction": "Unknown",
-                "ai_description": "The prediction service is temporarily unavailable. Please try again later."
-            }), 503
-        
-        data = request.get_json(force=True)
-        print("raw data:", repr(data))
+SYMPTOM_FALLBACKS = {
+    "Depression": "Depression is a common but serious condition. It's important to reach out for support from friends, family, or a mental health professional. Self-care activities like exercise, good sleep, and social connection can help. Remember, seeking help is a sign of strength.",
 
-        if not data:
-            return jsonify({"error": "No input data provided"}), 400
+    "Anxiety": "Anxiety disorders are treatable conditions. Consider practicing relaxation techniques like deep breathing or meditation. Regular exercise and maintaining a consistent sleep schedule can help. A mental health professional can provide effective treatments.",
 
-        if isinstance(data, dict) and "symptoms" in data:
-            payload = data["symptoms"]
-        else:
-            payload = data
+    "Anxiety Disorder": "Anxiety disorders are treatable conditions. Consider practicing relaxation techniques like deep breathing or meditation. Regular exercise and maintaining a consistent sleep schedule can help. A mental health professional can provide effective treatments.",
 
-        frontend_to_backend = {
-            "sadness": ["sadness", "depressive_symptoms", "low_mood"],
-            "anxiety": ["severe_anxiety", "excessive_worry", "feeling_on_edge"],
-            "sleep_disturbance": ["sleep_disturbance", "sleep_problem_from_obsessive_thinking", "decreased_need_for_sleep"],
-            "loss_of_interest": ["loss_of_interest", "loss_of_pleasure", "inability_to_feel_pleasure"],
-            "fatigue": ["fatigue", "feeling_easily_tired"],
-            "difficulty_concentrating": ["difficulty_concentrating", "trouble_concentrating ", "mind_going_blank"],
-            "social_isolation": ["social_isolation", "social_withdrawal", "avoidance_of_social_activity"],
-            "irritability": ["irritability", "irritable_mood", "intense_anger"],
-            "excessive_worry": ["excessive_worry", "excessive_fear_of_mistakes"],
-            "low_energy": ["low_energy", "lack_of_motivation"],
-        }
-
-        sample = {feat: 0 for feat in symptoms}
-
-        def is_positive(val):
-            if isinstance(val, bool):
-                return val
-            try:
-                s = str(val).strip().lower()
-            except Exception:
-                return False
-            return s in ("1", "true", "on", "yes")
+    "Bipolar Disorder": "Bipolar disorder requires professional management for the best outcomes. Maintaining a regular sleep schedule and taking prescribed medications consistently are important. Working with a psychiatrist and therapist can help manage mood episodes effectively.",
 
-        for k, v in payload.items():
-            mapped = frontend_to_backend.get(k, [k] if k in sample else [])
+    "Normal": "Your responses suggest you're in a good mental health state. Continue maintaining healthy habits like regular exercise, good sleep, and social connections. Remember, it's always okay to reach out for support if things change.",
 
-            for backend_feat in mapped:
-                if backend_feat in sample:
-                    sample[backend_feat] = 1 if is_positive(v) else 0
+    "Stress": "Stress is a normal response but chronic stress needs attention. Try stress management techniques like exercise, meditation, or talking to someone. If stress persists, consider consulting a mental health professional."
+}
 
-        ordered_values = [sample[feat] for feat in symptoms]
-        df = pd.DataFrame([ordered_values], columns=symptoms)
 
-        pred = clf.predict(df)[0]
-        pred_disease = le.inverse_transform([pred])[0]
-        
-        print(f"🎯 Predicted condition: {pred_disease}")
+SYMPTOMS_UNAVAILABLE = {
+    "error": "Models not loaded. Please check server logs.",
+    "prediction": "Unknown",
+    "ai_description": "The prediction service is temporarily unavailable. Please try again later."
+}
 
-        # Get selected symptoms
-        selected_symptoms = [k for k, v in payload.items() if is_positive(v)]
-        symptom_text = ", ".join(selected_symptoms) if selected_symptoms else "general symptoms"
 
-        # Generate AI Summary
-        prompt = f"""You are a compassionate mental health assistant.
+def build_symptom_input(payload):
+    """Symptom payload -> (values ordered like `symptoms`, selected symptom keys)."""
+    ordered_values = symptom_vector({k: is_positive(v) for k, v in payload.items()}, symptoms)
+    selected_symptoms = [k for k, v in payload.items() if is_positive(v)]
+    return ordered_values, selected_symptoms
+
+
+def symptom_prompt(pred_disease, selected_symptoms):
+    symptom_text = ", ".join(selected_symptoms) if selected_symptoms else "general symptoms"
+    return f"""You are a compassionate mental health assistant.
 
 Condition detected: {pred_disease}
 Symptoms reported: {symptom_text}
@@ -245,28 +349,47 @@ Provide a brief, empathetic summary (3-4 sentences) that includes:
 
 Keep the tone warm, supportive, and non-judgmental."""
 
-        ai_description = call_gemini_api(prompt)
+
+def symptom_fallback(pred_disease):
+    return SYMPTOM_FALLBACKS.get(
+        pred_disease, 
+        f"Based on your symptoms, it appears you may have {pred_disease}. Please consult with a qualified mental health professional for proper evaluation and treatment. Your mental health matters."
+    )
+
+
+@app.route("/predict_symptoms", methods=["POST"])
+def predict_symptoms():
+    try:
+        # Check if models are loaded
+        if not symptom_model_ready() or not symptoms:
+            return jsonify(SYMPTOMS_UNAVAILABLE), 503
+        
+        data = request.get_json(force=True)
+        print("raw data:", repr(data))
+
+        if not data:
+            return jsonify({"error": "No input data provided"}), 400
+
+        if isinstance(data, dict) and "symptoms" in data:
+            payload = data["symptoms"]
+        else:
+            payload = data
+
+        ordered_values, selected_symptoms = build_symptom_input(payload)
+        try:
+            pred_disease = predict_symptom_condition(ordered_values)
+        except UNAVAILABLE_ERRORS as e:
+            print(f"⚠️ Inference server unavailable: {e}")
+            return jsonify(SYMPTOMS_UNAVAILABLE), 503
+        
+        print(f"🎯 Predicted condition: {pred_disease}")
+
+        # Generate AI Summary
+        ai_description = call_gemini_api(symptom_prompt(pred_disease, selected_symptoms))
         
         if not ai_description:
             print("⚠️ Using fallback message")
-            fallback_messages = {
-                "Depression": "Depression is a common but serious condition. It's important to reach out for support from friends, family, or a mental health professional. Self-care activities like exercise, good sleep, and social connection can help. Remember, seeking help is a sign of strength.",
-                
-                "Anxiety": "Anxiety disorders are treatable conditions. Consider practicing relaxation techniques like deep breathing or meditation. Regular exercise and maintaining a consistent sleep schedule can help. A mental health professional can provide effective treatments.",
-                
-                "Anxiety Disorder": "Anxiety disorders are treatable conditions. Consider practicing relaxation techniques like deep breathing or meditation. Regular exercise and maintaining a consistent sleep schedule can help. A mental health professional can provide effective treatments.",
-                
-                "Bipolar Disorder": "Bipolar disorder requires professional management for the best outcomes. Maintaining a regular sleep schedule and taking prescribed medications consistently are important. Working with a psychiatrist and therapist can help manage mood episodes effectively.",
-                
-                "Normal": "Your responses suggest you're in a good mental health state. Continue maintaining healthy habits like regular exercise, good sleep, and social connections. Remember, it's always okay to reach out for support if things change.",
-                
-                "Stress": "Stress is a normal response but chronic stress needs attention. Try stress management techniques like exercise, meditation, or talking to someone. If stress persists, consider consulting a mental health professional."
-            }
-            
-            ai_description = fallback_messages.get(
-                pred_disease, 
-                f"Based on your symptoms, it appears you may have {pred_disease}. Please consult with a qualified mental health professional for proper evaluation and treatment. Your mental health matters."
-            )
+            ai_description = symptom_fallback(pred_disease)
 
         return jsonify({
             "prediction": pred_disease,
@@ -282,44 +405,123 @@ Keep the tone warm, supportive, and non-judgmental."""
         }), 500
 
 
+@app.route("/predict_symptoms/status", methods=["GET"])
+def symptom_model_status_route():
+    try:
+        status = symptom_model_status()
+    except Exception as e:
+        print(f"⚠️ Error reading symptom model status: {e}")
+        status = None
+    if status is None:
+        return jsonify({"error": "Models not loaded. Please check server logs."}), 503
+    return jsonify(status), 200
+
+
 # ==========================
-# Text Prediction
+# Adaptive Symptom Questionnaire
 # ==========================
-@app.route("/predict_text", methods=["POST"])
-def predict_text():
+@app.route("/adaptive_questionnaire", methods=["POST"])
+def adaptive_questionnaire():
     try:
-        statement = request.form.get("statement", "") or (request.json.get("statement") if request.is_json else "")
-        if not statement:
-            return jsonify({"message": "No statement provided"}), 400
+        if questionnaire is None:
+            return jsonify({"error": "Questionnaire not available. Please check server logs."}), 503
 
-        statement_lower = statement.lower()
-        keyword_mapping = {
-            "Depression": ["sad", "hopeless", "empty"],
-            "Anxiety": ["anxious", "panic", "fear"],
-            "Sleep Disorder": ["sleep", "tired", "insomnia"],
-            "Social Anxiety": ["social", "public", "awkward"],
-            "Bipolar Disorder": ["mood", "manic", "energetic"],
-            "PTSD": ["trauma", "flashback", "abuse"],
-            "OCD": ["obsess", "ritual"],
-            "ADHD": ["focus", "distract"],
-            "Eating Disorder": ["eating", "weight"],
-            "General Stress": ["stress", "pressure"]
-        }
-
-        condition_scores = {
-            cond: sum(1 for k in keys if k in statement_lower)
-            for cond, keys in keyword_mapping.items()
-        }
-
-        if max(condition_scores.values()) > 0:
-            predicted_condition = max(condition_scores, key=condition_scores.get)
-        else:
-            predicted_condition = "General Mental Health Concern"
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({"error": "Request body must be a JSON object"}), 400
+        payload = data.get("answers", {})
+        if not isinstance(payload, dict):
+            return jsonify({"error": "'answers' must be an object of symptom -> yes/no"}), 400
 
-        print(f"🎯 Text prediction: {predicted_condition}")
+        answers = {}
+        for k, v in payload.items():
+            answer = parse_answer(v)
+            if answer is None:
+                # "unknown" / null is skipped rather than counted as a "no"
+                continue
+            # Dataset columns (including every next_symptom we return) are taken
+            # as-is; only frontend-only keys such as "anxiety" are expanded
+            mapped = [k] if k in questionnaire.symptom_index else FRONTEND_TO_BACKEND.get(k, [k])
+            for backend_feat in mapped:
+                answers[backend_feat] = answer
 
-        # Generate AI Summary
-        prompt = f"""You are a compassionate mental health assistant.
+        try:
+            top_k = int(data.get("top_k", 3))
+            max_questions = int(data.get("max_questions", 15))
+            confidence = float(data.get("confidence", 0.9))
+        except (TypeError, ValueError):
+            return jsonify({"error": "top_k, max_questions and confidence must be numbers"}), 400
+
+        result = questionnaire.step(
+            answers,
+            top_k=max(1, min(top_k, len(questionnaire.conditions))),
+            max_questions=max_questions,
+            confidence=confidence,
+        )
+        return jsonify(result), 200
+
+    except Exception as e:
+        print(f"🔥 ERROR in adaptive_questionnaire: {str(e)}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+# ==========================
+# Text Prediction
+# ==========================
+TEXT_FALLBACKS = {
+    "Depression": "It sounds like you're going through a difficult time. Depression is treatable, and reaching out for support is an important step. Consider talking to a mental health professional who can help.",
+
+    "Anxiety": "Anxiety can be overwhelming. Remember that what you're feeling is valid. Consider practicing relaxation techniques and speaking with a therapist who can provide effective coping strategies.",
+
+    "Sleep Disorder": "Sleep issues can significantly impact your well-being. Try maintaining a consistent sleep schedule and creating a relaxing bedtime routine. If problems persist, consult a healthcare provider.",
+
+    "Social Anxiety": "Social anxiety is common and manageable. Taking small steps and being kind to yourself is important. A therapist can help you develop strategies to feel more comfortable in social situations.",
+
+    "Bipolar Disorder": "Mood fluctuations can be challenging. Professional support is important for managing bipolar disorder effectively. Consider reaching out to a psychiatrist who can provide appropriate treatment.",
+
+    "PTSD": "Trauma can have lasting effects. You deserve support in processing these experiences. A trauma-informed therapist can help you work through what you've been through.",
+
+    "OCD": "Intrusive thoughts and compulsions can be distressing. OCD is treatable with proper therapy. Consider consulting a mental health professional who specializes in OCD treatment.",
+
+    "ADHD": "Difficulty focusing is a common experience. ADHD is manageable with the right support and strategies. Consider talking to a healthcare provider about evaluation and treatment options.",
+
+    "Eating Disorder": "Your relationship with food and body image matters. Eating disorders require specialized treatment. Please reach out to a healthcare provider who can offer appropriate support.",
+
+    "General Stress": "It's understandable to feel stressed. Remember to take care of yourself through this challenging time. If stress becomes overwhelming, don't hesitate to seek professional support."
+}
+
+
+def keyword_text_condition(statement):
+    """Keyword-based condition used by /predict_text."""
+    statement_lower = statement.lower()
+    keyword_mapping = {
+        "Depression": ["sad", "hopeless", "empty"],
+        "Anxiety": ["anxious", "panic", "fear"],
+        "Sleep Disorder": ["sleep", "tired", "insomnia"],
+        "Social Anxiety": ["social", "public", "awkward"],
+        "Bipolar Disorder": ["mood", "manic", "energetic"],
+        "PTSD": ["trauma", "flashback", "abuse"],
+        "OCD": ["obsess", "ritual"],
+        "ADHD": ["focus", "distract"],
+        "Eating Disorder": ["eating", "weight"],
+        "General Stress": ["stress", "pressure"]
+    }
+
+    condition_scores = {
+        cond: sum(1 for k in keys if k in statement_lower)
+        for cond, keys in keyword_mapping.items()
+    }
+
+    if max(condition_scores.values()) > 0:
+        predicted_condition = max(condition_scores, key=condition_scores.get)
+    else:
+        predicted_condition = "General Mental Health Concern"
+    return predicted_condition
+
+
+def text_prompt(statement, predicted_condition):
+    return f"""You are a compassionate mental health assistant.
 
 A person wrote: "{statement}"
 
@@ -332,36 +534,31 @@ Provide a brief, empathetic response (2-3 sentences) that:
 
 Keep the tone warm and non-judgmental."""
 
-        ai_description = call_gemini_api(prompt)
+
+def text_fallback(predicted_condition):
+    return TEXT_FALLBACKS.get(
+        predicted_condition,
+        "Thank you for sharing. Your mental health matters. Consider reaching out to a mental health professional for personalized support and guidance."
+    )
+
+
+@app.route("/predict_text", methods=["POST"])
+def predict_text():
+    try:
+        statement = request.form.get("statement", "") or (request.json.get("statement") if request.is_json else "")
+        if not statement:
+            return jsonify({"message": "No statement provided"}), 400
+
+        predicted_condition = keyword_text_condition(statement)
+
+        print(f"🎯 Text prediction: {predicted_condition}")
+
+        # Generate AI Summary
+        ai_description = call_gemini_api(text_prompt(statement, predicted_condition))
         
         if not ai_description:
             print("⚠️ Using fallback message")
-            fallback_messages = {
-                "Depression": "It sounds like you're going through a difficult time. Depression is treatable, and reaching out for support is an important step. Consider talking to a mental health professional who can help.",
-                
-                "Anxiety": "Anxiety can be overwhelming. Remember that what you're feeling is valid. Consider practicing relaxation techniques and speaking with a therapist who can provide effective coping strategies.",
-                
-                "Sleep Disorder": "Sleep issues can significantly impact your well-being. Try maintaining a consistent sleep schedule and creating a relaxing bedtime routine. If problems persist, consult a healthcare provider.",
-                
-                "Social Anxiety": "Social anxiety is common and manageable. Taking small steps and being kind to yourself is important. A therapist can help you develop strategies to feel more comfortable in social situations.",
-                
-                "Bipolar Disorder": "Mood fluctuations can be challenging. Professional support is important for managing bipolar disorder effectively. Consider reaching out to a psychiatrist who can provide appropriate treatment.",
-                
-                "PTSD": "Trauma can have lasting effects. You deserve support in processing these experiences. A trauma-informed therapist can help you work through what you've been through.",
-                
-                "OCD": "Intrusive thoughts and compulsions can be distressing. OCD is treatable with proper therapy. Consider consulting a mental health professional who specializes in OCD treatment.",
-                
-                "ADHD": "Difficulty focusing is a common experience. ADHD is manageable with the right support and strategies. Consider talking to a healthcare provider about evaluation and treatment options.",
-                
-                "Eating Disorder": "Your relationship with food and body image matters. Eating disorders require specialized treatment. Please reach out to a healthcare provider who can offer appropriate support.",
-                
-                "General Stress": "It's understandable to feel stressed. Remember to take care of yourself through this challenging time. If stress becomes overwhelming, don't hesitate to seek professional support."
-            }
-            
-            ai_description = fallback_messages.get(
-                predicted_condition,
-                "Thank you for sharing. Your mental health matters. Consider reaching out to a mental health professional for personalized support and guidance."
-            )
+            ai_description = text_fallback(predicted_condition)
 
         return jsonify({
             "prediction": predicted_condition,
@@ -377,6 +574,73 @@ Keep the tone warm and non-judgmental."""
 # ==========================
 # Emotion Prediction
 # ==========================
+EMOTION_UNAVAILABLE_MESSAGE = "Emotion detection is currently unavailable on this server. Please use the text-based or symptom-based prediction features instead. Your mental health matters, and we're here to support you through other means."
+
+EMOTION_FALLBACKS = {
+    "happy": "It's wonderful to see you happy! Keep embracing the positive moments. 😊",
+    "sad": "It's okay to feel sad. Remember, this feeling is temporary and you're not alone. 💙",
+    "angry": "Take a deep breath. It's natural to feel angry, but you have the strength to work through it. 💪",
+    "fear": "Feeling fearful is valid. Take things one step at a time, and be kind to yourself. 🌟",
+    "surprise": "Surprises can be overwhelming! Take a moment to process what you're feeling. ✨",
+    "neutral": "You seem calm and balanced. This is a great state for reflection. 🧘",
+    "disgust": "If something is bothering you, it's okay to step away and take care of yourself. 🌿"
+}
+
+
+def analyze_emotion(DeepFace, frame):
+    return DeepFace.analyze(
+        img_path=frame,
+        actions=["emotion"],
+        enforce_detection=False,
+        detector_backend='opencv'
+    )
+
+
+def dominant_emotion(result):
+    """DeepFace result -> (emotion, None) or (None, user-facing error)."""
+    if isinstance(result, list):
+        if len(result) == 0:
+            print("❌ DeepFace returned empty list")
+            return None, "No face detected. Please ensure your face is visible and well-lit."
+        result = result[0]
+
+    detected_emotion = None
+
+    if "dominant_emotion" in result:
+        detected_emotion = result["dominant_emotion"]
+    elif "emotion" in result:
+        if isinstance(result["emotion"], dict):
+            emotions = result["emotion"]
+            detected_emotion = max(emotions, key=emotions.get)
+        elif isinstance(result["emotion"], str):
+            detected_emotion = result["emotion"]
+
+    if not detected_emotion:
+        print("❌ Could not extract emotion from result")
+        return None, "Unable to detect emotion. Try turning on lights and face the camera."
+    return detected_emotion, None
+
+
+def emotion_prompt(detected_emotion):
+    return f"""You are a compassionate mental health assistant.
+
+The detected emotion is: {detected_emotion}
+
+Provide a brief, empathetic supportive message (2-3 sentences) that:
+1. Acknowledges the emotion
+2. Offers comfort or encouragement
+3. Provides a gentle suggestion for wellbeing
+
+Keep it warm and supportive."""
+
+
+def emotion_fallback(detected_emotion):
+    return EMOTION_FALLBACKS.get(
+        detected_emotion.lower(), 
+        "You are stronger than you think. Take care of your mental health. ❤️"
+    )
+
+
 @app.route("/predict_emotion", methods=["POST", "OPTIONS"])
 def predict_emotion():
     # Handle OPTIONS preflight request
@@ -418,14 +682,14 @@ def predict_emotion():
         # Lazy import DeepFace to avoid startup crashes
         # DeepFace is optional - if not available, return a helpful message
         try:
-            from deepface import DeepFace
+            DeepFace = load_deepface()
         except ImportError as import_error:
             print(f"⚠️ DeepFace not available: {import_error}")
             print("⚠️ Emotion detection requires DeepFace. Using fallback response.")
             # Return a friendly fallback response
             response = jsonify({
                 "emotion": "Neutral",
-                "gemini_output": "Emotion detection is currently unavailable on this server. Please use the text-based or symptom-based prediction features instead. Your mental health matters, and we're here to support you through other means."
+                "gemini_output": EMOTION_UNAVAILABLE_MESSAGE
             })
             response.headers.add("Access-Control-Allow-Origin", "*")
             return response, 200
@@ -437,75 +701,25 @@ def predict_emotion():
             response.headers.add("Access-Control-Allow-Origin", "*")
             return response, 503
         
-        result = DeepFace.analyze(
-            img_path=frame,
-            actions=["emotion"],
-            enforce_detection=False,
-            detector_backend='opencv'
-        )
+        result = analyze_emotion(DeepFace, frame)
 
         print("📊 DeepFace raw result:", result)
 
-        if isinstance(result, list):
-            if len(result) == 0:
-                print("❌ DeepFace returned empty list")
-                response = jsonify({
-                    "error": "No face detected. Please ensure your face is visible and well-lit."
-                })
-                response.headers.add("Access-Control-Allow-Origin", "*")
-                return response, 200
-            result = result[0]
-
-        detected_emotion = None
-        
-        if "dominant_emotion" in result:
-            detected_emotion = result["dominant_emotion"]
-        elif "emotion" in result:
-            if isinstance(result["emotion"], dict):
-                emotions = result["emotion"]
-                detected_emotion = max(emotions, key=emotions.get)
-            elif isinstance(result["emotion"], str):
-                detected_emotion = result["emotion"]
+        detected_emotion, emotion_error = dominant_emotion(result)
 
         print(f"🎯 Detected emotion: {detected_emotion}")
 
-        if not detected_emotion:
-            print("❌ Could not extract emotion from result")
-            response = jsonify({
-                "error": "Unable to detect emotion. Try turning on lights and face the camera."
-            })
+        if emotion_error:
+            response = jsonify({"error": emotion_error})
             response.headers.add("Access-Control-Allow-Origin", "*")
             return response, 200
 
         # Generate AI Summary
-        prompt = f"""You are a compassionate mental health assistant.
-
-The detected emotion is: {detected_emotion}
-
-Provide a brief, empathetic supportive message (2-3 sentences) that:
-1. Acknowledges the emotion
-2. Offers comfort or encouragement
-3. Provides a gentle suggestion for wellbeing
-
-Keep it warm and supportive."""
-
-        gemini_output = call_gemini_api(prompt)
+        gemini_output = call_gemini_api(emotion_prompt(detected_emotion))
         
         if not gemini_output:
             print("⚠️ Using fallback message")
-            fallback_messages = {
-                "happy": "It's wonderful to see you happy! Keep embracing the positive moments. 😊",
-                "sad": "It's okay to feel sad. Remember, this feeling is temporary and you're not alone. 💙",
-                "angry": "Take a deep breath. It's natural to feel angry, but you have the strength to work through it. 💪",
-                "fear": "Feeling fearful is valid. Take things one step at a time, and be kind to yourself. 🌟",
-                "surprise": "Surprises can be overwhelming! Take a moment to process what you're feeling. ✨",
-                "neutral": "You seem calm and balanced. This is a great state for reflection. 🧘",
-                "disgust": "If something is bothering you, it's okay to step away and take care of yourself. 🌿"
-            }
-            gemini_output = fallback_messages.get(
-                detected_emotion.lower(), 
-                "You are stronger than you think. Take care of your mental health. ❤️"
-            )
+            gemini_output = emotion_fallback(detected_emotion)
 
         print("✅ Emotion prediction successful!")
         response = jsonify({
@@ -589,6 +803,38 @@ def detect_text_emotion(text):
     return best if scores[best] > 0 else "Neutral"
 
 
+MULTIMODAL_FALLBACKS = {
+    "Sad": "It's okay to feel sad. These feelings are valid and temporary. Consider reaching out to someone you trust or a mental health professional.",
+    "Anxious": "Anxiety can feel overwhelming. Try taking slow, deep breaths. If anxiety persists, professional support can provide effective coping strategies.",
+    "Angry": "Anger is a natural emotion. Take a moment to breathe and identify what's causing these feelings. Talking to someone can help process these emotions.",
+    "Stressed": "Stress is a normal response to challenges. Make sure you're taking breaks and practicing self-care. If stress becomes unmanageable, seek support.",
+    "Happy": "It's wonderful that you're feeling positive! Keep nurturing your mental wellbeing through healthy activities and connections.",
+    "Neutral": "You seem balanced right now. Continue with healthy habits and remember that support is available if you need it."
+}
+
+
+def multimodal_prompt(statement, text_pred, detected_emotion):
+    return f"""You are a compassionate mental health assistant.
+
+A person wrote: "{statement}"
+
+Analysis shows: {text_pred} with a {detected_emotion} tone
+
+Provide a brief, empathetic response (2-3 sentences) that:
+1. Acknowledges their emotional state
+2. Offers supportive guidance
+3. Encourages healthy coping or professional help if appropriate
+
+Keep it warm and supportive."""
+
+
+def multimodal_fallback(detected_emotion, text_pred):
+    return MULTIMODAL_FALLBACKS.get(
+        detected_emotion,
+        f"Your emotional state suggests {text_pred.lower()}. Taking care of your mental health is important. Consider speaking with a professional for personalized support."
+    )
+
+
 @app.route("/predict_multimodal", methods=["POST"])
 def predict_multimodal():
     try:
@@ -602,9 +848,7 @@ def predict_multimodal():
         if not statement:
             return jsonify({"error": "No statement provided"}), 400
 
-        vector = vectorizer.transform([statement.lower()])
-        text_pred = text_model.predict(vector)[0]
-        confidence = float(text_model.predict_proba(vector)[0].max())
+        text_pred, confidence = predict_text_condition(statement)
 
         detected_emotion = detect_text_emotion(statement)
 
@@ -615,36 +859,11 @@ def predict_multimodal():
         print(f"🎯 Multimodal prediction: {combined_result}")
 
         # Generate AI Summary
-        prompt = f"""You are a compassionate mental health assistant.
-
-A person wrote: "{statement}"
-
-Analysis shows: {text_pred} with a {detected_emotion} tone
-
-Provide a brief, empathetic response (2-3 sentences) that:
-1. Acknowledges their emotional state
-2. Offers supportive guidance
-3. Encourages healthy coping or professional help if appropriate
-
-Keep it warm and supportive."""
-
-        gemini_output = call_gemini_api(prompt)
+        gemini_output = call_gemini_api(multimodal_prompt(statement, text_pred, detected_emotion))
         
         if not gemini_output:
             print("⚠️ Using fallback message")
-            emotion_responses = {
-                "Sad": "It's okay to feel sad. These feelings are valid and temporary. Consider reaching out to someone you trust or a mental health professional.",
-                "Anxious": "Anxiety can feel overwhelming. Try taking slow, deep breaths. If anxiety persists, professional support can provide effective coping strategies.",
-                "Angry": "Anger is a natural emotion. Take a moment to breathe and identify what's causing these feelings. Talking to someone can help process these emotions.",
-                "Stressed": "Stress is a normal response to challenges. Make sure you're taking breaks and practicing self-care. If stress becomes unmanageable, seek support.",
-                "Happy": "It's wonderful that you're feeling positive! Keep nurturing your mental wellbeing through healthy activities and connections.",
-                "Neutral": "You seem balanced right now. Continue with healthy habits and remember that support is available if you need it."
-            }
-            
-            gemini_output = emotion_responses.get(
-                detected_emotion,
-                f"Your emotional state suggests {text_pred.lower()}. Taking care of your mental health is important. Consider speaking with a professional for personalized support."
-            )
+            gemini_output = multimodal_fallback(detected_emotion, text_pred)
 
         return jsonify({
             "text_prediction": text_pred,
@@ -659,20 +878,141 @@ Keep it warm and supportive."""
         return jsonify({"error": str(e)}), 500
 
 
+# ==========================
+# Feedback
+# ==========================
+@app.route("/feedback", methods=["POST"])
+def feedback():
+    # Corrections train the TF-IDF text model behind /predict_multimodal, so labels
+    # must be that model's classes. /predict_text is keyword-based and is not retrained.
+    try:
+        data = request.get_json(silent=True) or request.form.to_dict()
+        statement = str(data.get("statement") or "").strip()
+        label = str(data.get("label") or "").strip()
+
+        if not statement or not label:
+            return jsonify({"error": "Both 'statement' and 'label' are required"}), 400
+
+        status = feedback_status()
+        if status is None:
+            return jsonify({"error": "Text model not loaded. Please check server logs."}), 503
+        if label not in status["labels"]:
+            return jsonify({"error": f"Unknown label: {label}", "labels": status["labels"]}), 400
+
+        feedback_log.append({
+            "statement": statement,
+            "label": label,
+            "predicted": data.get("predicted"),
+            "source": data.get("source"),
+            "user_id": session.get("user_id"),
+            "timestamp": time.time(),
+        })
+        return jsonify({"message": "Feedback recorded", "model_version": status["model_version"]}), 201
+
+    except Exception as e:
+        print(f"🔥 ERROR in feedback: {str(e)}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/feedback/status", methods=["GET"])
+def feedback_status_route():
+    status = feedback_status()
+    if status is None:
+        return jsonify({"error": "Text model not loaded. Please check server logs."}), 503
+    return jsonify(status), 200
+
+
+# ==========================
+# Bulk Risk Scoring
+# ==========================
+@app.route("/score_risk_bulk", methods=["POST"])
+def score_risk_bulk():
+    # Loaded on first use: workers that never bulk-score don't hold the model
+    try:
+        risk_model = risk_scoring.get_risk_model()
+    except Exception as e:
+        print(f"⚠️ Error loading risk model: {e}")
+        return jsonify({"error": "Risk model not loaded. Run train_risk_model.py."}), 503
+
+    fmt = request.args.get("format", "ndjson").lower()
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+    try:
+        chunksize = int(request.args.get("chunksize", risk_scoring.DEFAULT_CHUNKSIZE))
+    except ValueError:
+        return jsonify({"error": "chunksize must be an integer"}), 400
+    chunksize = max(1, min(chunksize, 500_000))
+    id_column = request.args.get("id_column") or None
+
+    if "file" in request.files:
+        # Werkzeug has already spooled the upload to disk. Flask closes request.files
+        # when this view returns, so take ownership of the handle for the generator.
+        upload = request.files["file"]
+        source = upload.stream
+        upload.stream = tempfile.SpooledTemporaryFile()
+    else:
+        # Spool the raw body first: reading it while streaming the response can
+        # deadlock clients that send the whole body before reading
+        source = tempfile.TemporaryFile()
+        shutil.copyfileobj(request.stream, source, 1024 * 1024)
+        source.seek(0)
+
+    stats = risk_scoring.ScoringStats()
+    chunks = risk_scoring.iter_scored_chunks(risk_model, source, chunksize, id_column, stats)
+
+    # Score the first chunk up front so schema errors still get a proper 400
+    try:
+        first = next(chunks, None)
+    except (ValueError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        source.close()
+        return jsonify({"error": f"Invalid CSV: {e}"}), 400
+
+    def generate():
+        try:
+            if first is None:
+                return
+            yield risk_scoring.format_chunk(first, fmt, first=True)
+            for scored in chunks:
+                yield risk_scoring.format_chunk(scored, fmt, first=False)
+        except Exception as e:
+            print(f"🔥 ERROR in score_risk_bulk after {stats.rows} rows: {str(e)}")
+            traceback.print_exc()
+            # Trailing error record in both formats, so a cut-short stream is detectable
+            yield risk_scoring.format_error(fmt, first.columns, stats.rows, str(e))
+            return
+        finally:
+            source.close()
+
+        print(f"📊 Bulk risk scoring: {stats.rows} rows in {stats.seconds:.2f}s "
+              f"({stats.rows_per_sec:,.0f} rows/sec)")
+        if fmt == "ndjson":
+            yield json.dumps({"summary": stats.as_dict()}) + "\n"
+
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
 # ==========================
 # Chatbot
 # ==========================
+CHAT_FALLBACK = "I'm here to listen and support you. How can I help you today?"
+
+
+def chat_prompt(message):
+    return f"You are a friendly and supportive mental health assistant. Respond to: {message}"
+
+
 @app.route("/chat", methods=["POST"])
 def chat():
     try:
         data = request.get_json()
         message = data.get("message", "")
 
-        prompt = f"You are a friendly and supportive mental health assistant. Respond to: {message}"
-        reply = call_gemini_api(prompt)
+        reply = call_gemini_api(chat_prompt(message))
         
         if not reply:
-            reply = "I'm here to listen and support you. How can I help you today?"
+            reply = CHAT_FALLBACK
 
         return jsonify({"reply": reply}), 200
 
@@ -0,0 +1,335 @@
+"""Async (ASGI) serving mode.
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+
+The prediction and chat routes are served here and await the Gemini call,
+so a single process keeps many slow LLM requests in flight instead of
+pinning one gunicorn thread per request. Model inference, image decoding
+and DeepFace run on a bounded thread pool (ASGI_CPU_WORKERS). Responses
+have the same JSON shapes and status codes as the Flask views.
+
+Every other route is the unchanged Flask view from app.py, mounted through
+a2wsgi.
+"""
+import os
+import json
+import asyncio
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from werkzeug.exceptions import BadRequest, UnsupportedMediaType
+
+import app as flask_backend
+from inference_server import UNAVAILABLE_ERRORS
+
+CPU_WORKERS = int(os.environ.get("ASGI_CPU_WORKERS", 4))
+_cpu_pool = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="asgi-cpu")
+
+
+async def run_cpu(func, *args):
+    """Run blocking model code off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_cpu_pool, func, *args)
+
+
+async def call_gemini(prompt):
+    # Looked up on the module at call time so it can be swapped out (bench_async_serving.py)
+    return await flask_backend.call_gemini_api_async(prompt)
+
+
+def is_json(request):
+    """Same test as Flask's request.is_json."""
+    mimetype = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    return mimetype == "application/json" or (
+        mimetype.startswith("application/") and mimetype.endswith("+json")
+    )
+
+
+async def get_json(request, force=False, silent=False):
+    """Flask's request.get_json(), raising the same errors, so status codes match the views."""
+    if not (force or is_json(request)):
+        if silent:
+            return None
+        raise UnsupportedMediaType(
+            "Did not attempt to load JSON data because the request Content-Type was not 'application/json'."
+        )
+    try:
+        return json.loads(await request.body())
+    except ValueError:
+        if silent:
+            return None
+        raise BadRequest()
+
+
+async def get_form(request):
+    """request.form: parsed fields for form bodies, empty otherwise."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(("multipart/form-data", "application/x-www-form-urlencoded")):
+        return await request.form()
+    return {}
+
+
+# ==========================
+# Symptom Prediction
+# ==========================
+async def predict_symptoms(request):
+    try:
+        if not flask_backend.symptom_model_ready() or not flask_backend.symptoms:
+            return JSONResponse(flask_backend.SYMPTOMS_UNAVAILABLE, 503)
+
+        data = await get_json(request, force=True)
+
+        if not data:
+            return JSONResponse({"error": "No input data provided"}, 400)
+
+        if isinstance(data, dict) and "symptoms" in data:
+            payload = data["symptoms"]
+        else:
+            payload = data
+
+        ordered_values, selected_symptoms = flask_backend.build_symptom_input(payload)
+        try:
+            pred_disease = await run_cpu(flask_backend.predict_symptom_condition, ordered_values)
+        except UNAVAILABLE_ERRORS as e:
+            print(f"⚠️ Inference server unavailable: {e}")
+            return JSONResponse(flask_backend.SYMPTOMS_UNAVAILABLE, 503)
+
+        print(f"🎯 Predicted condition: {pred_disease}")
+
+        ai_description = await call_gemini(flask_backend.symptom_prompt(pred_disease, selected_symptoms))
+
+        if not ai_description:
+            print("⚠️ Using fallback message")
+            ai_description = flask_backend.symptom_fallback(pred_disease)
+
+        return JSONResponse({
+            "prediction": pred_disease,
+            "ai_description": ai_description
+        }, 200)
+
+    except Exception as e:
+        print(f"🔥 ERROR in predict_symptoms: {str(e)}")
+        traceback.print_exc()
+        return JSONResponse({
+            "error": str(e),
+            "trace": traceback.format_exc()
+        }, 500)
+
+
+# ==========================
+# Text Prediction
+# ==========================
+async def predict_text(request):
+    try:
+        form = await get_form(request)
+        statement = form.get("statement", "") or ((await get_json(request)).get("statement") if is_json(request) else "")
+        if not statement:
+            return JSONResponse({"message": "No statement provided"}, 400)
+
+        predicted_condition = flask_backend.keyword_text_condition(statement)
+
+        print(f"🎯 Text prediction: {predicted_condition}")
+
+        ai_description = await call_gemini(flask_backend.text_prompt(statement, predicted_condition))
+
+        if not ai_description:
+            print("⚠️ Using fallback message")
+            ai_description = flask_backend.text_fallback(predicted_condition)
+
+        return JSONResponse({
+            "prediction": predicted_condition,
+            "ai_description": ai_description
+        }, 200)
+
+    except Exception as e:
+        print(f"🔥 ERROR in predict_text: {str(e)}")
+        traceback.print_exc()
+        return JSONResponse({"error": str(e)}, 500)
+
+
+# ==========================
+# Emotion Prediction
+# ==========================
+def decode_image(data):
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+async def predict_emotion(request):
+    # Preflight with Access-Control-Request-Method is answered by CORSMiddleware
+    if request.method == "OPTIONS":
+        return Response(status_code=200)
+
+    print("\n📌 /predict_emotion hit!")
+
+    try:
+        form = await request.form()
+        if "image" not in form:
+            print("❌ No image in request")
+            return JSONResponse({"error": "No image provided"}, 400)
+
+        image_file = form["image"]
+        print(f"📷 Image file received: {image_file.filename}")
+
+        frame = await run_cpu(decode_image, await image_file.read())
+
+        if frame is None:
+            print("❌ Failed to decode image")
+            return JSONResponse({"error": "Invalid image format"}, 400)
+
+        print(f"✅ Image decoded successfully, shape: {frame.shape}")
+        print("🧠 Running DeepFace...")
+
+        try:
+            DeepFace = await run_cpu(flask_backend.load_deepface)
+        except ImportError as import_error:
+            print(f"⚠️ DeepFace not available: {import_error}")
+            return JSONResponse({
+                "emotion": "Neutral",
+                "gemini_output": flask_backend.EMOTION_UNAVAILABLE_MESSAGE
+            }, 200)
+        except Exception as import_error:
+            print(f"⚠️ DeepFace import failed: {import_error}")
+            return JSONResponse({
+                "error": "Emotion detection service is temporarily unavailable. Please try again later."
+            }, 503)
+
+        result = await run_cpu(flask_backend.analyze_emotion, DeepFace, frame)
+
+        detected_emotion, emotion_error = flask_backend.dominant_emotion(result)
+
+        print(f"🎯 Detected emotion: {detected_emotion}")
+
+        if emotion_error:
+            return JSONResponse({"error": emotion_error}, 200)
+
+        gemini_output = await call_gemini(flask_backend.emotion_prompt(detected_emotion))
+
+        if not gemini_output:
+            print("⚠️ Using fallback message")
+            gemini_output = flask_backend.emotion_fallback(detected_emotion)
+
+        print("✅ Emotion prediction successful!")
+        return JSONResponse({
+            "emotion": detected_emotion.capitalize(),
+            "gemini_output": gemini_output
+        }, 200)
+
+    except ValueError as ve:
+        print(f"🔥 ValueError in predict_emotion: {str(ve)}")
+        print(traceback.format_exc())
+        return JSONResponse({
+            "error": "Face detection failed. Please ensure your face is clearly visible."
+        }, 500)
+
+    except Exception as e:
+        print(f"🔥 ERROR in predict_emotion: {str(e)}")
+        print(traceback.format_exc())
+        return JSONResponse({
+            "error": f"Emotion detection failed: {str(e)}"
+        }, 500)
+
+
+# ==========================
+# Multimodal Prediction
+# ==========================
+async def predict_multimodal(request):
+    try:
+        form = await get_form(request)
+        json_payload = await get_json(request, silent=True) if is_json(request) else None
+        statement = (
+            form.get("statement")
+            or (json_payload or {}).get("statement")
+            or ""
+        ).strip()
+
+        if not statement:
+            return JSONResponse({"error": "No statement provided"}, 400)
+
+        text_pred, confidence = await run_cpu(flask_backend.predict_text_condition, statement)
+
+        detected_emotion = flask_backend.detect_text_emotion(statement)
+
+        combined_result = (
+            f"{text_pred} with a {detected_emotion} tone ({confidence * 100:.1f}% confidence)"
+        )
+
+        print(f"🎯 Multimodal prediction: {combined_result}")
+
+        gemini_output = await call_gemini(
+            flask_backend.multimodal_prompt(statement, text_pred, detected_emotion)
+        )
+
+        if not gemini_output:
+            print("⚠️ Using fallback message")
+            gemini_output = flask_backend.multimodal_fallback(detected_emotion, text_pred)
+
+        return JSONResponse({
+            "text_prediction": text_pred,
+            "emotion_detected": detected_emotion,
+            "combined_result": combined_result,
+            "gemini_output": gemini_output
+        }, 200)
+
+    except Exception as e:
+        print("🔥 ERROR:", str(e))
+        print(traceback.format_exc())
+        return JSONResponse({"error": str(e)}, 500)
+
+
+# ==========================
+# Chatbot
+# ==========================
+async def chat(request):
+    try:
+        data = await get_json(request)
+        message = data.get("message", "")
+
+        reply = await call_gemini(flask_backend.chat_prompt(message))
+
+        if not reply:
+            reply = flask_backend.CHAT_FALLBACK
+
+        return JSONResponse({"reply": reply}, 200)
+
+    except Exception as e:
+        print(f"🔥 ERROR in chat: {str(e)}")
+        return JSONResponse({"reply": f"Error: {str(e)}"}, 500)
+
+
+# ==========================
+# ASGI Application
+# ==========================
+async_routes = Starlette(
+    routes=[
+        Route("/predict_symptoms", predict_symptoms, methods=["POST"]),
+        Route("/predict_text", predict_text, methods=["POST"]),
+        Route("/predict_emotion", predict_emotion, methods=["POST", "OPTIONS"]),
+        Route("/predict_multimodal", predict_multimodal, methods=["POST"]),
+        Route("/chat", chat, methods=["POST"]),
+    ],
+    # Same CORS behaviour as flask_cors in app.py: any origin, echoed so credentials work
+    middleware=[Middleware(
+        CORSMiddleware,
+        allow_origin_regex=".*",
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )],
+)
+ASYNC_PATHS = {route.path for route in async_routes.routes}
+
+flask_routes = WSGIMiddleware(flask_backend.app)
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan" or scope.get("path") in ASYNC_PATHS:
+        await async_routes(scope, receive, send)
+    else:
+        await flask_routes(scope, receive, send)
@@ -0,0 +1,158 @@
+"""Compare Flask (gunicorn threads) vs the ASGI mode under slow LLM calls.
+
+Both servers run in one process with the Gemini call replaced by a fixed
+delay, so the numbers show how many slow LLM requests each can keep in
+flight. Requests are fired with a fixed concurrency and throughput plus
+latency percentiles are reported.
+
+    python bench_async_serving.py --concurrency 64 --requests 512 --llm-latency 1.0
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PAYLOADS = {
+    "/chat": {"message": "I have been feeling a bit low lately"},
+    "/predict_text": {"statement": "I feel sad and hopeless most days"},
+    "/predict_multimodal": {"statement": "Work pressure is overwhelming me and I feel anxious"},
+}
+
+
+def patch_llm(latency):
+    """Swap both Gemini helpers in app.py for a fixed delay."""
+    import app as flask_backend
+
+    def slow_llm(prompt, model_name="gemini-pro"):
+        time.sleep(latency)
+        return "Simulated LLM reply."
+
+    async def slow_llm_async(prompt, model_name="gemini-pro"):
+        await asyncio.sleep(latency)
+        return "Simulated LLM reply."
+
+    flask_backend.call_gemini_api = slow_llm
+    flask_backend.call_gemini_api_async = slow_llm_async
+    return flask_backend
+
+
+def serve(mode, port, threads, latency):
+    flask_backend = patch_llm(latency)
+
+    if mode == "flask":
+        from gunicorn.app.base import BaseApplication
+
+        class FlaskServer(BaseApplication):
+            def load_config(self):
+                self.cfg.set("bind", f"127.0.0.1:{port}")
+                self.cfg.set("workers", 1)
+                self.cfg.set("worker_class", "gthread")
+                self.cfg.set("threads", threads)
+                self.cfg.set("backlog", 4096)
+                self.cfg.set("accesslog", None)
+
+            def load(self):
+                return flask_backend.app
+
+        FlaskServer().run()
+    else:
+        import uvicorn
+        import asgi_app
+
+        uvicorn.run(asgi_app.app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+
+async def fire(url, payload, n_requests, concurrency):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=600) as client:
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                t0 = time.perf_counter()
+                response = await client.post(url, json=payload)
+                latencies.append(time.perf_counter() - t0)
+                if response.status_code != 200:
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(n_requests)))
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "seconds": elapsed,
+        "req_per_sec": n_requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "errors": errors,
+    }
+
+
+def wait_until_up(base_url, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+def run(mode, args):
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", mode,
+         "--port", str(args.port), "--threads", str(args.threads),
+         "--llm-latency", str(args.llm_latency)],
+        cwd=BASE_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_up(base_url)
+        url, payload = base_url + args.path, PAYLOADS[args.path]
+        asyncio.run(fire(url, payload, min(args.concurrency, args.requests), args.concurrency))  # warm-up
+        return asyncio.run(fire(url, payload, args.requests, args.concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", choices=sorted(PAYLOADS), default="/predict_multimodal")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="simulated Gemini latency (s)")
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads for the Flask run")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--serve", choices=("flask", "asgi"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.threads, args.llm_latency)
+        return
+
+    print(f"{args.path}: {args.requests} requests, concurrency {args.concurrency}, "
+          f"LLM latency {args.llm_latency:.2f}s")
+    print(f"{'mode':<22} {'seconds':>8} {'req/s':>8} {'p50 s':>7} {'p95 s':>7} {'errors':>7}")
+    for mode, label in (("flask", f"flask ({args.threads} threads)"), ("asgi", "asgi (uvicorn)")):
+        r = run(mode, args)
+        print(f"{label:<22} {r['seconds']:>8.2f} {r['req_per_sec']:>8.1f} "
+              f"{r['p50']:>7.2f} {r['p95']:>7.2f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Compare in-process models vs the shared inference server.
+
+Starts N worker processes that each fire a mix of symptom and text
+predictions, either against their own copy of the models (what every
+gunicorn worker does today) or through inference_server.py. Reports total
+RSS/PSS of all processes involved and overall throughput.
+
+    python bench_inference_server.py --workers 4 --requests 500
+"""
+import os
+import sys
+import time
+import random
+import secrets
+import argparse
+import subprocess
+import multiprocessing as mp
+
+from inference_server import BASE_DIR, DEFAULT_SOCKET, InferenceClient, load_models, load_symptom_columns
+
+STATEMENTS = [
+    "I feel sad and hopeless most days",
+    "I can't stop worrying and my heart races",
+    "Work pressure is overwhelming me lately",
+    "I have trouble sleeping and feel tired all the time",
+    "Everything is fine, I'm just checking in",
+]
+
+
+def read_memory_kb(pid):
+    """(rss, pss) in kB from /proc; pss counts shared pages fairly."""
+    rss = pss = 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        pss = rss
+    return rss, pss
+
+
+def worker(mode, socket_path, n_requests, ready, start, results):
+    rng = random.Random(os.getpid())
+
+    if mode == "inprocess":
+        models = load_models()
+        symptoms = models["symptoms"]
+
+        # Same predictor the server uses, so the comparison is memory/IPC only
+        def predict_symptoms(values):
+            return models["symptom_predictor"].predict(values)[0]
+
+        def predict_text(statement):
+            vector = models["vectorizer"].transform([statement.lower()])
+            return models["text_model"].predict(vector)[0], float(models["text_model"].predict_proba(vector)[0].max())
+    else:
+        client = InferenceClient(socket_path)
+        symptoms = load_symptom_columns()
+        predict_symptoms = client.predict_symptoms
+        predict_text = client.predict_text
+
+    # Warm up so lazily allocated buffers count towards memory
+    predict_symptoms([0] * len(symptoms))
+    predict_text(STATEMENTS[0])
+
+    ready.set()
+    start.wait()
+
+    t0 = time.perf_counter()
+    for i in range(n_requests):
+        if i % 2:
+            predict_text(rng.choice(STATEMENTS))
+        else:
+            predict_symptoms([1 if rng.random() < 0.05 else 0 for _ in symptoms])
+    results.put(time.perf_counter() - t0)
+
+
+def run(mode, n_workers, n_requests, socket_path):
+    ctx = mp.get_context("spawn")
+    server = None
+    if mode == "server":
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(BASE_DIR, "inference_server.py"), "--socket", socket_path],
+            stdout=subprocess.DEVNULL,
+        )
+        client = InferenceClient(socket_path)
+        for _ in range(600):
+            try:
+                client.call("ping", None)
+                break
+            except (OSError, EOFError):
+                time.sleep(0.1)
+
+    ready_events = [ctx.Event() for _ in range(n_workers)]
+    start = ctx.Event()
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=worker, args=(mode, socket_path, n_requests, ready_events[i], start, results))
+        for i in range(n_workers)
+    ]
+    for p in procs:
+        p.start()
+    for ev in ready_events:
+        ev.wait()
+
+    pids = [p.pid for p in procs] + ([server.pid] if server else [])
+    rss, pss = (sum(vals) for vals in zip(*(read_memory_kb(pid) for pid in pids)))
+
+    t0 = time.perf_counter()
+    start.set()
+    for _ in procs:
+        results.get()
+    elapsed = time.perf_counter() - t0
+
+    for p in procs:
+        p.join()
+    if server:
+        server.terminate()
+        server.wait()
+
+    total = n_workers * n_requests
+    return {
+        "mode": mode,
+        "rss_mb": rss / 1024,
+        "pss_mb": pss / 1024,
+        "requests": total,
+        "seconds": elapsed,
+        "req_per_sec": total / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=500, help="requests per worker")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET + ".bench")
+    args = parser.parse_args()
+
+    # The server requires a key; spawned workers and the server inherit it
+    os.environ.setdefault("INFERENCE_AUTHKEY", secrets.token_hex(32))
+
+    print(f"{'mode':<10} {'RSS MB':>9} {'PSS MB':>9} {'requests':>9} {'seconds':>8} {'req/s':>9}")
+    for mode in ("inprocess", "server"):
+        r = run(mode, args.workers, args.requests, args.socket)
+        print(f"{r['mode']:<10} {r['rss_mb']:>9.1f} {r['pss_mb']:>9.1f} {r['requests']:>9} "
+              f"{r['seconds']:>8.2f} {r['req_per_sec']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
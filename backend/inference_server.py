@@ -0,0 +1,357 @@
+"""Shared inference server for multi-worker deployments.
+
+One process owns the symptom classifier, the text model and (once used)
+DeepFace, and serves every gunicorn worker over a Unix socket. Requests
+that arrive within a short window are batched across workers.
+
+    export INFERENCE_AUTHKEY=$(openssl rand -hex 32)
+    python inference_server.py --socket /tmp/mindcheck-inference/inference.sock
+    INFERENCE_SOCKET=/tmp/mindcheck-inference/inference.sock gunicorn -w 4 app:app
+
+Messages are pickled, so INFERENCE_AUTHKEY is required: both sides must
+pass its HMAC handshake before anything is unpickled. The socket directory
+must also be owned by the current user with mode 0700; the server and the
+clients refuse to use it otherwise.
+"""
+import os
+import stat
+import time
+import socket
+import queue
+import argparse
+import threading
+import traceback
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+import joblib
+import pandas as pd
+
+from online_learning import start_trainer
+from symptom_inference import build_symptom_predictor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOCKET = "/tmp/mindcheck-inference/inference.sock"
+FEEDBACK_FILE = os.path.join(BASE_DIR, "feedback_log.jsonl")
+
+# DeepFace calls take seconds, so they get their own queue and never stall
+# the symptom/text batches
+_SLOW_KINDS = ("deepface_check", "emotion")
+
+# Exceptions that keep their type across the socket so app.py can handle them as before
+_FORWARDED_ERRORS = {"ImportError": ImportError, "ValueError": ValueError}
+
+
+# Errors that mean the inference server can't be reached or can't be trusted
+UNAVAILABLE_ERRORS = (OSError, EOFError, AuthenticationError)
+
+
+def load_authkey():
+    key = os.environ.get("INFERENCE_AUTHKEY")
+    return key.encode() if key else None
+
+
+def check_private_dir(path):
+    """Refuse a socket directory another local user created or can write to."""
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(
+            f"{path} must be a directory owned by uid {os.getuid()} with mode 0700"
+        )
+
+
+def _socket_is_live(address):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(address)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def load_symptom_columns():
+    """Symptom feature order, read from the CSV header only."""
+    header = pd.read_csv(os.path.join(BASE_DIR, "mental_symptoms_illness.csv"), nrows=0)
+    return [col for col in header.columns if col != "Disease"]
+
+
+def load_models():
+    """Load every model the Flask app serves, mirroring app.py."""
+    symptoms = load_symptom_columns()
+    return {
+        # Only the predictor is kept; it drops the pickled forest once flattened
+        "symptom_predictor": build_symptom_predictor(
+            joblib.load(os.path.join(BASE_DIR, "model.pkl")),
+            joblib.load(os.path.join(BASE_DIR, "label_encoder.pkl")),
+            symptoms,
+        ),
+        "text_model": joblib.load(os.path.join(BASE_DIR, "logistic_regression_model.pkl")),
+        "vectorizer": joblib.load(os.path.join(BASE_DIR, "tfidf_vectorizer.pkl")),
+        "symptoms": symptoms,
+    }
+
+
+class _Pending:
+    __slots__ = ("kind", "payload", "done", "reply")
+
+    def __init__(self, kind, payload):
+        self.kind = kind
+        self.payload = payload
+        self.done = threading.Event()
+        self.reply = None
+
+
+class InferenceServer:
+    """Accepts worker connections and runs their requests in batches."""
+
+    def __init__(self, address, models, max_batch=64, batch_window=0.002):
+        self.address = address
+        self.models = models
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self._queue = queue.Queue()
+        self._slow_queue = queue.Queue()
+        self._deepface = None
+        self.text_trainer = start_trainer(
+            models["text_model"], models["vectorizer"], FEEDBACK_FILE, self._publish_text_model
+        )
+        self._handlers = {
+            "ping": self._run_ping,
+            "symptoms": self._run_symptoms,
+            "symptom_status": self._run_symptom_status,
+            "text": self._run_text,
+            "feedback_status": self._run_feedback_status,
+            "deepface_check": self._run_deepface_check,
+            "emotion": self._run_emotion,
+        }
+
+    def _prepare_socket_path(self):
+        socket_dir = os.path.dirname(os.path.abspath(self.address))
+        os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+        # exist_ok skips the mode for a directory that was already there
+        check_private_dir(socket_dir)
+
+        if os.path.exists(self.address):
+            if _socket_is_live(self.address):
+                raise RuntimeError(f"Another inference server is already listening on {self.address}")
+            # Left behind by a server that exited without cleaning up
+            os.unlink(self.address)
+
+    def serve_forever(self, authkey):
+        if not authkey:
+            raise ValueError("INFERENCE_AUTHKEY must be set to run the inference server")
+        self._prepare_socket_path()
+
+        for q in (self._queue, self._slow_queue):
+            threading.Thread(target=self._batch_loop, args=(q,), daemon=True).start()
+
+        # Owner-only socket file from the moment it is bound
+        old_umask = os.umask(0o077)
+        try:
+            listener = Listener(self.address, family="AF_UNIX", authkey=authkey)
+        finally:
+            os.umask(old_umask)
+
+        with listener:
+            print(f"✅ Inference server listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError, AuthenticationError) as e:
+                    # Failed authkey handshake or a peer that hung up mid-handshake
+                    print(f"⚠️ Rejected inference connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        try:
+            while True:
+                kind, payload = conn.recv()
+                item = _Pending(kind, payload)
+                (self._slow_queue if kind in _SLOW_KINDS else self._queue).put(item)
+                item.done.wait()
+                conn.send(item.reply)
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _batch_loop(self, q):
+        while True:
+            batch = [q.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        groups = {}
+        for item in batch:
+            groups.setdefault(item.kind, []).append(item)
+
+        for kind, items in groups.items():
+            handler = self._handlers.get(kind)
+            try:
+                if handler is None:
+                    raise ValueError(f"Unknown request kind: {kind}")
+                results = handler([item.payload for item in items])
+                replies = [("ok", result) for result in results]
+            except Exception as e:
+                traceback.print_exc()
+                replies = [("error", type(e).__name__, str(e))] * len(items)
+
+            for item, reply in zip(items, replies):
+                item.reply = reply
+                item.done.set()
+
+    # --------------------------
+    # Handlers (one call per batch)
+    # --------------------------
+    def _run_ping(self, payloads):
+        return ["pong"] * len(payloads)
+
+    def _run_symptoms(self, payloads):
+        return [label for label, _ in self.models["symptom_predictor"].predict_many(payloads)]
+
+    def _run_symptom_status(self, payloads):
+        return [self.models["symptom_predictor"].stats()] * len(payloads)
+
+    def _publish_text_model(self, model):
+        self.models["text_model"] = model
+
+    def _run_text(self, payloads):
+        text_model = self.models["text_model"]
+        vector = self.models["vectorizer"].transform([s.lower() for s in payloads])
+        preds = text_model.predict(vector)
+        confidences = text_model.predict_proba(vector).max(axis=1)
+        return [(str(p), float(c)) for p, c in zip(preds, confidences)]
+
+    def _run_feedback_status(self, payloads):
+        return [self.text_trainer.status()] * len(payloads)
+
+    def _load_deepface(self):
+        if self._deepface is None:
+            from deepface import DeepFace
+            self._deepface = DeepFace
+        return self._deepface
+
+    def _run_deepface_check(self, payloads):
+        self._load_deepface()
+        return [True] * len(payloads)
+
+    def _run_emotion(self, payloads):
+        # DeepFace has no batch API for in-memory frames; frames run back to back
+        DeepFace = self._load_deepface()
+        return [DeepFace.analyze(**kwargs) for kwargs in payloads]
+
+
+class InferenceClient:
+    """Thin per-worker client; one socket connection per thread."""
+
+    def __init__(self, address, timeout=60, authkey=None):
+        self.address = address
+        self.timeout = timeout
+        self.authkey = authkey if authkey is not None else load_authkey()
+        if not self.authkey:
+            raise ValueError("INFERENCE_AUTHKEY must be set to use the inference server")
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            check_private_dir(os.path.dirname(os.path.abspath(self.address)))
+            conn = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
+    def call(self, kind, payload):
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.send((kind, payload))
+                if not conn.poll(self.timeout):
+                    self._reset()
+                    raise TimeoutError(f"Inference server did not answer within {self.timeout}s")
+                reply = conn.recv()
+                break
+            except (EOFError, ConnectionError, FileNotFoundError):
+                # Server restarted or connection went stale: reconnect once
+                self._reset()
+                if attempt:
+                    raise
+
+        if reply[0] == "ok":
+            return reply[1]
+        _, error_type, message = reply
+        raise _FORWARDED_ERRORS.get(error_type, RuntimeError)(message)
+
+    def available(self):
+        """True if the server answers a ping."""
+        try:
+            return self.call("ping", None) == "pong"
+        except UNAVAILABLE_ERRORS + (RuntimeError,):
+            return False
+
+    def predict_symptoms(self, ordered_values):
+        return self.call("symptoms", list(ordered_values))
+
+    def predict_text(self, statement):
+        return self.call("text", statement)
+
+    def symptom_model_status(self):
+        return self.call("symptom_status", None)
+
+    def feedback_status(self):
+        return self.call("feedback_status", None)
+
+    def deepface(self):
+        """Stand-in for the DeepFace module; raises ImportError if the server lacks it."""
+        self.call("deepface_check", None)
+        return _RemoteDeepFace(self)
+
+
+class _RemoteDeepFace:
+    def __init__(self, client):
+        self._client = client
+
+    def analyze(self, **kwargs):
+        return self._client.call("emotion", kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared model server for gunicorn workers")
+    parser.add_argument("--socket", default=os.environ.get("INFERENCE_SOCKET", DEFAULT_SOCKET))
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--batch-window-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    authkey = load_authkey()
+    if not authkey:
+        raise SystemExit("❌ INFERENCE_AUTHKEY is not set. Export a random secret, e.g. $(openssl rand -hex 32).")
+
+    models = load_models()
+    print("✅ All models loaded successfully")
+    InferenceServer(
+        args.socket,
+        models,
+        max_batch=args.max_batch,
+        batch_window=args.batch_window_ms / 1000.0,
+    ).serve_forever(authkey)
+
+
+if __name__ == "__main__":
+    main()
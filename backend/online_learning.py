@@ -0,0 +1,191 @@
+"""Incremental text-model updates from user feedback.
+
+Corrections are appended to a JSONL log. A background thread replays new
+entries as mini-batch gradient steps on the text model's own loss (the
+multinomial log loss LogisticRegression minimises) and publishes a fresh
+copy of the model with the updated weights, so serving keeps its softmax
+probabilities and only ever sees a reference swap. Intercepts (the class
+priors) are not updated, so a batch of corrections shifts the words it
+contains rather than every prediction.
+
+Only full batches are applied, in log order, so the model depends only on
+how much of the log has been consumed. ``model_version`` is the number of
+batches applied: workers that have caught up with the same log report the
+same version and serve the same weights.
+"""
+import os
+import copy
+import json
+import time
+import threading
+import traceback
+
+import numpy as np
+
+
+class FeedbackLog:
+    """Append-only JSONL file of labeled corrections."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read_from(self, offset):
+        """Return (records, new_offset) for complete lines after ``offset``."""
+        if not os.path.exists(self.path):
+            return [], offset
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+
+        # A line still being written by another worker is picked up next time
+        end = data.rfind(b"\n") + 1
+        records = []
+        for raw in data[:end].splitlines():
+            try:
+                records.append(json.loads(raw))
+            except ValueError:
+                print(f"⚠️ Skipping malformed feedback line: {raw[:80]!r}")
+        return records, offset + end
+
+
+def softmax_step(coef, intercept, X, y_index, learning_rate):
+    """One gradient step on the log loss of a fitted LogisticRegression, in place on ``coef``."""
+    scores = np.asarray(X @ coef.T) + intercept
+    if coef.shape[0] == 1:
+        # Binary LogisticRegression: one score through a sigmoid
+        error = 1.0 / (1.0 + np.exp(-scores)) - (y_index == 1)[:, None]
+    else:
+        scores -= scores.max(axis=1, keepdims=True)
+        error = np.exp(scores)
+        error /= error.sum(axis=1, keepdims=True)
+        error[np.arange(len(y_index)), y_index] -= 1.0
+    coef -= learning_rate * np.asarray(X.T @ (error / len(y_index))).T
+
+
+class OnlineTextTrainer:
+    """Periodically applies logged feedback to a copy of the weights and publishes it."""
+
+    def __init__(self, model, vectorizer, feedback_log, publish, interval=60.0, batch_size=32,
+                 learning_rate=2.0):
+        self.vectorizer = vectorizer
+        self.feedback_log = feedback_log
+        self.publish = publish
+        self.interval = interval
+        self.batch_size = batch_size
+        self.learning_rate = learning_rate
+        self.labels = [str(c) for c in model.classes_]
+        self._label_index = {label: i for i, label in enumerate(self.labels)}
+
+        self._template = copy.deepcopy(model)
+        self._coef = np.array(model.coef_, dtype=np.float64, copy=True)
+        self._offset = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+        # Plain counters so status() never reads the log or takes the lock
+        self.pending_feedback = 0
+        self.samples_applied = 0
+        self.updates_published = 0
+        self.last_update_at = None
+        self.last_update_seconds = None
+        self.last_error = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="online-text-trainer", daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+                traceback.print_exc()
+
+    @property
+    def version(self):
+        return self.samples_applied // self.batch_size
+
+    def _read_new(self):
+        records, self._offset = self.feedback_log.read_from(self._offset)
+        self._pending.extend(
+            r for r in records
+            if str(r.get("label")) in self._label_index and str(r.get("statement", "")).strip()
+        )
+
+    def _published_copy(self):
+        model = copy.deepcopy(self._template)
+        model.coef_ = self._coef.copy()
+        return model
+
+    def run_once(self):
+        """Apply every full batch of pending feedback; returns the number of samples used."""
+        with self._lock:
+            self._read_new()
+            self.pending_feedback = len(self._pending)
+            n_batches = len(self._pending) // self.batch_size
+            if not n_batches:
+                return 0
+
+            started = time.perf_counter()
+            used = n_batches * self.batch_size
+            for i in range(0, used, self.batch_size):
+                batch = self._pending[i:i + self.batch_size]
+                X = self.vectorizer.transform([str(r["statement"]).lower() for r in batch])
+                y_index = np.array([self._label_index[str(r["label"])] for r in batch])
+                softmax_step(self._coef, self._template.intercept_, X, y_index, self.learning_rate)
+            del self._pending[:used]
+
+            # Serving code only ever receives a finished copy
+            self.publish(self._published_copy())
+
+            self.pending_feedback = len(self._pending)
+            self.samples_applied += used
+            self.updates_published += 1
+            self.last_update_at = time.time()
+            self.last_update_seconds = time.perf_counter() - started
+            self.last_error = None
+            print(f"✅ Text model v{self.version} published ({used} feedback samples)")
+            return used
+
+    def status(self):
+        # Lock-free and log-free so /feedback never waits on a training step.
+        # pending_feedback is as of the last poll.
+        return {
+            "model_version": self.version,
+            "update_interval_seconds": self.interval,
+            "batch_size": self.batch_size,
+            "learning_rate": self.learning_rate,
+            "samples_applied": self.samples_applied,
+            "updates_published": self.updates_published,
+            "pending_feedback": self.pending_feedback,
+            "last_update_at": self.last_update_at,
+            "last_update_seconds": self.last_update_seconds,
+            "last_error": self.last_error,
+            "labels": self.labels,
+        }
+
+
+def start_trainer(model, vectorizer, log_path, publish):
+    """Start a trainer configured from FEEDBACK_TRAIN_INTERVAL / FEEDBACK_BATCH_SIZE / FEEDBACK_LEARNING_RATE."""
+    return OnlineTextTrainer(
+        model,
+        vectorizer,
+        FeedbackLog(log_path),
+        publish,
+        interval=float(os.environ.get("FEEDBACK_TRAIN_INTERVAL", 60)),
+        batch_size=int(os.environ.get("FEEDBACK_BATCH_SIZE", 32)),
+        learning_rate=float(os.environ.get("FEEDBACK_LEARNING_RATE", 2.0)),
+    ).start()
@@ -0,0 +1,211 @@
+"""Bulk risk scoring for anxiety_depression_data.csv-style records.
+
+``predicted_condition`` is the screening label the project notebook derives
+from this schema: Anxiety, Depression, Both or None, using a cutoff of 10 on
+Anxiety_Score / Depression_Score. It is computed from that rule directly.
+``risk_score`` is a smoothed version of the same rule: the model's
+probability of any flagged condition (1 - P(None)), which is near 0 or 1
+far from the cutoff and in between close to it. The other fields are kept
+as model inputs, but in anxiety_depression_data.csv they are uncorrelated
+with the scores and with each other (|r| < 0.09).
+
+The two screening scores are required: a row where either is missing or
+non-numeric gets null results and an ``error`` message instead of a
+score.
+
+Input CSVs are read and scored in fixed-size chunks, so memory stays flat
+no matter how large the file is. Each chunk goes through the model in one
+vectorized predict_proba call and is emitted as soon as it is scored.
+
+    python risk_scoring.py partners.csv -o scores.ndjson --chunksize 50000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RISK_MODEL_PATH = os.path.join(BASE_DIR, "risk_model.pkl")
+
+SCORE_COLUMNS = ["Anxiety_Score", "Depression_Score"]
+NUMERIC_COLUMNS = SCORE_COLUMNS + [
+    "Age", "Sleep_Hours", "Physical_Activity_Hrs", "Social_Support_Score", "Stress_Level",
+    "Family_History_Mental_Illness", "Chronic_Illnesses", "Therapy", "Meditation",
+    "Financial_Stress", "Work_Stress", "Self_Esteem_Score", "Life_Satisfaction_Score",
+    "Loneliness_Score",
+]
+CATEGORICAL_COLUMNS = ["Gender", "Education_Level", "Employment_Status", "Medication_Use", "Substance_Use"]
+FEATURE_COLUMNS = NUMERIC_COLUMNS + CATEGORICAL_COLUMNS
+
+CONDITION_THRESHOLD = 10
+NO_CONDITION = "None"
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def assign_condition(df, threshold=CONDITION_THRESHOLD):
+    """Vectorized version of the notebook's Anxiety/Depression/Both/None label."""
+    anxious = df["Anxiety_Score"] >= threshold
+    depressed = df["Depression_Score"] >= threshold
+    return pd.Series(
+        np.select([anxious & depressed, anxious, depressed], ["Both", "Anxiety", "Depression"], NO_CONDITION),
+        index=df.index,
+    )
+
+
+def read_records(source, chunksize=None):
+    """pd.read_csv with the dataset's conventions ("None" is a category, not NaN)."""
+    return pd.read_csv(
+        source,
+        chunksize=chunksize,
+        keep_default_na=False,
+        na_values=[""],
+        dtype={col: str for col in CATEGORICAL_COLUMNS},
+    )
+
+
+def prepare_features(df):
+    """Select model inputs; bad numbers become NaN for the model's imputers."""
+    missing = [col for col in FEATURE_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    X = df[FEATURE_COLUMNS].copy()
+    for col in NUMERIC_COLUMNS:
+        X[col] = pd.to_numeric(X[col], errors="coerce")
+    return X
+
+
+def load_risk_model(path=RISK_MODEL_PATH):
+    return joblib.load(path)
+
+
+_model_lock = threading.Lock()
+_model = None
+
+
+def get_risk_model():
+    """Load the risk model on first use so workers that never bulk-score skip it."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_risk_model()
+    return _model
+
+
+def score_frame(model, df, start_row=0, id_column=None):
+    """Score one chunk; returns a DataFrame of per-row results."""
+    X = prepare_features(df)
+    classes = [str(c) for c in model.classes_]
+
+    missing = X[SCORE_COLUMNS].isna()
+    valid = ~missing.any(axis=1).to_numpy()
+    proba = np.full((len(df), len(classes)), np.nan)
+    if valid.any():
+        proba[valid] = model.predict_proba(X[valid])
+
+    out = pd.DataFrame({"row": np.arange(start_row, start_row + len(df))})
+    if id_column:
+        out[id_column] = df[id_column].to_numpy()
+    out["predicted_condition"] = assign_condition(X).where(valid, None).to_numpy()
+    out["risk_score"] = 1.0 - proba[:, classes.index(NO_CONDITION)]
+    for i, label in enumerate(classes):
+        out[f"p_{label.lower()}"] = proba[:, i]
+
+    error = np.full(len(df), None, dtype=object)
+    for i in np.flatnonzero(~valid):
+        bad = [col for col in SCORE_COLUMNS if missing[col].iat[i]]
+        error[i] = f"Missing or non-numeric {', '.join(bad)}"
+    out["error"] = error
+    return out.round(4)
+
+
+class ScoringStats:
+    def __init__(self):
+        self.rows = 0
+        self.rows_invalid = 0
+        self.chunks = 0
+        self.started = time.perf_counter()
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "rows_invalid": self.rows_invalid,
+            "chunks": self.chunks,
+            "seconds": round(self.seconds, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+        }
+
+
+def iter_scored_chunks(model, source, chunksize=DEFAULT_CHUNKSIZE, id_column=None, stats=None):
+    """Yield scored DataFrames, one per input chunk."""
+    stats = stats if stats is not None else ScoringStats()
+    for chunk in read_records(source, chunksize=chunksize):
+        if id_column and id_column not in chunk.columns:
+            raise ValueError(f"ID column not found: {id_column}")
+        scored = score_frame(model, chunk, start_row=stats.rows, id_column=id_column)
+        stats.rows += len(chunk)
+        stats.rows_invalid += int(scored["error"].notna().sum())
+        stats.chunks += 1
+        yield scored
+
+
+def format_chunk(scored, fmt, first):
+    if fmt == "csv":
+        return scored.to_csv(index=False, header=first)
+    return scored.to_json(orient="records", lines=True, double_precision=4).rstrip("\n") + "\n"
+
+
+def format_error(fmt, columns, rows_scored, message):
+    """Last record of a stream that stopped early, so clients can tell it is incomplete."""
+    message = " ".join(str(message).split())  # parser errors end in a newline
+    if fmt == "csv":
+        row = pd.DataFrame([{"row": rows_scored, "error": f"Scoring stopped after {rows_scored} rows: {message}"}],
+                           columns=columns)
+        return row.to_csv(index=False, header=False)
+    return json.dumps({"error": message, "rows_scored": rows_scored}) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk risk scoring for anxiety/depression tabular records")
+    parser.add_argument("input", help="CSV file to score ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file ('-' for stdout)")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--id-column", default=None, help="input column copied to each output row")
+    parser.add_argument("--model", default=RISK_MODEL_PATH)
+    args = parser.parse_args()
+
+    model = load_risk_model(args.model)
+    source = sys.stdin if args.input == "-" else args.input
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+
+    stats = ScoringStats()
+    try:
+        for scored in iter_scored_chunks(model, source, args.chunksize, args.id_column, stats):
+            out.write(format_chunk(scored, args.format, first=stats.chunks == 1))
+            print(f"📊 {stats.rows} rows scored ({stats.rows_per_sec:,.0f} rows/sec)", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"✅ Done: {stats.rows} rows in {stats.seconds:.2f}s ({stats.rows_per_sec:,.0f} rows/sec)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
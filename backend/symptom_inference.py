@@ -0,0 +1,288 @@
+"""Memoized, compact inference for the symptom classifier.
+
+Symptom input is a 0/1 vector over the dataset columns, so each request is
+encoded as an integer bitmask. Predictions are looked up in a table
+precomputed for every input the frontend form can produce, then in a
+bounded LRU. Misses are scored by a flattened copy of the forest (plain
+numpy arrays walked for all trees at once) instead of the pickled
+estimator.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Frontend symptom keys -> dataset columns they switch on
+FRONTEND_TO_BACKEND = {
+    "sadness": ["sadness", "depressive_symptoms", "low_mood"],
+    "anxiety": ["severe_anxiety", "excessive_worry", "feeling_on_edge"],
+    "sleep_disturbance": ["sleep_disturbance", "sleep_problem_from_obsessive_thinking", "decreased_need_for_sleep"],
+    "loss_of_interest": ["loss_of_interest", "loss_of_pleasure", "inability_to_feel_pleasure"],
+    "fatigue": ["fatigue", "feeling_easily_tired"],
+    "difficulty_concentrating": ["difficulty_concentrating", "trouble_concentrating ", "mind_going_blank"],
+    "social_isolation": ["social_isolation", "social_withdrawal", "avoidance_of_social_activity"],
+    "irritability": ["irritability", "irritable_mood", "intense_anger"],
+    "excessive_worry": ["excessive_worry", "excessive_fear_of_mistakes"],
+    "low_energy": ["low_energy", "lack_of_motivation"],
+}
+
+
+def symptom_vector(answers, symptoms):
+    """{symptom key: bool} -> 0/1 list ordered like ``symptoms``.
+
+    Frontend keys switch on their mapped dataset columns; dataset columns
+    are taken as-is. Later answers overwrite earlier ones.
+    """
+    sample = dict.fromkeys(symptoms, 0)
+    for key, positive in answers.items():
+        for column in FRONTEND_TO_BACKEND.get(key, [key] if key in sample else []):
+            if column in sample:
+                sample[column] = 1 if positive else 0
+    return [sample[column] for column in symptoms]
+
+
+def frontend_vectors(symptoms):
+    """Every vector the frontend form can send (all yes/no combinations)."""
+    keys = list(FRONTEND_TO_BACKEND)
+    for bits in range(1 << len(keys)):
+        answers = {key: bool(bits >> i & 1) for i, key in enumerate(keys)}
+        yield symptom_vector(answers, symptoms)
+
+
+def encode_mask(values):
+    """0/1 vector -> int with bit i set when values[i] is set."""
+    mask = 0
+    for i, value in enumerate(values):
+        if value:
+            mask |= 1 << i
+    return mask
+
+
+class FlatForest:
+    """Tree ensemble flattened into node arrays; predict_proba matches sklearn's."""
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_estimator(cls, estimator, columns=None):
+        """Flatten a fitted DecisionTree/RandomForest/ExtraTrees classifier.
+
+        ``columns`` is the order callers pass features in; it defaults to
+        the order the estimator was fitted with.
+        """
+        trees = getattr(estimator, "estimators_", [estimator])
+        if not all(hasattr(tree, "tree_") for tree in trees) or getattr(estimator, "n_outputs_", 1) != 1:
+            raise TypeError(f"Cannot flatten {type(estimator).__name__}")
+
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            t = tree.tree_
+            leaf = t.children_left < 0
+            feature.append(t.feature)
+            threshold.append(t.threshold)
+            left.append(np.where(leaf, -1, t.children_left + offset))
+            right.append(np.where(leaf, -1, t.children_right + offset))
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            counts = t.value[:, 0, :]
+            totals = counts.sum(axis=1, keepdims=True)
+            totals[totals == 0.0] = 1.0
+            value.append(counts / totals)
+            roots.append(offset)
+            offset += t.node_count
+
+        feature = np.concatenate(feature).astype(np.intp)
+        names = getattr(estimator, "feature_names_in_", None)
+        if columns is not None and names is not None:
+            position = {name: i for i, name in enumerate(columns)}
+            remap = np.array([position[name] for name in names], dtype=np.intp)
+            feature = np.where(feature >= 0, remap[np.maximum(feature, 0)], -1)
+
+        return cls(
+            feature=feature,
+            threshold=np.concatenate(threshold),
+            left=np.concatenate(left).astype(np.intp),
+            right=np.concatenate(right).astype(np.intp),
+            value=np.concatenate(value),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max(tree.tree_.max_depth for tree in trees),
+        )
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right, self.value, self.roots))
+
+    def predict_proba(self, X):
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.repeat(self.roots[None, :], X.shape[0], axis=0)
+
+        for _ in range(self.max_depth):
+            feature = self.feature[nodes]
+            internal = feature >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, np.maximum(feature, 0)] <= self.threshold[nodes]
+            step = np.where(go_left, self.left[nodes], self.right[nodes])
+            nodes = np.where(internal, step, nodes)
+
+        return self.value[nodes].mean(axis=1)
+
+
+def _entry_bytes(mask, entry):
+    label, probs = entry
+    return sys.getsizeof(mask) + sys.getsizeof(entry) + sys.getsizeof(probs)
+
+
+class _EstimatorProba:
+    """Fallback for estimators that cannot be flattened."""
+
+    def __init__(self, estimator, columns):
+        self.estimator = estimator
+        self.columns = columns
+        self.nbytes = 0
+
+    def predict_proba(self, X):
+        return self.estimator.predict_proba(pd.DataFrame(X, columns=self.columns))
+
+
+class SymptomPredictor:
+    """bitmask -> (label, probabilities), from a precomputed table or a bounded LRU."""
+
+    def __init__(self, clf, le, symptoms, cache_size=4096):
+        self.symptoms = list(symptoms)
+        self.cache_size = cache_size
+        self.classes = [str(label) for label in le.inverse_transform(clf.classes_)]
+
+        try:
+            self.model = FlatForest.from_estimator(clf, self.symptoms)
+            self.backend = "flat_forest"
+        except TypeError as e:
+            print(f"⚠️ {e}; symptom misses use the estimator directly")
+            self.model = _EstimatorProba(clf, self.symptoms)
+            self.backend = "estimator"
+
+        self._table_index = {}
+        self._table_codes = None
+        self._table_probs = None
+        self._table_bytes = 0
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+
+        self.table_hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+
+    def _score(self, rows):
+        probs = self.model.predict_proba(np.asarray(rows))
+        labels = [self.classes[i] for i in probs.argmax(axis=1)]
+        return labels, probs
+
+    def precompute(self, vectors):
+        """Score every distinct vector once and keep the results for the process lifetime."""
+        rows = {}
+        for values in vectors:
+            rows.setdefault(encode_mask(values), values)
+
+        probs = np.ascontiguousarray(self.model.predict_proba(np.asarray(list(rows.values()))))
+        codes = probs.argmax(axis=1).astype(np.int16)
+        index = {mask: i for i, mask in enumerate(rows)}
+
+        with self._lock:
+            # Parallel arrays indexed through one dict: no per-entry tuples or row views
+            self._table_index = index
+            self._table_codes = codes
+            self._table_probs = probs
+            self._table_bytes = (
+                probs.nbytes
+                + codes.nbytes
+                + sys.getsizeof(index)
+                + sum(sys.getsizeof(mask) for mask in index)
+                # Ints above 256 are separate objects; smaller ones are interned
+                + sum(sys.getsizeof(i) for i in index.values() if i > 256)
+            )
+        return len(index)
+
+    def predict_many(self, rows):
+        """(label, probabilities) for each 0/1 vector, in order."""
+        masks = [encode_mask(values) for values in rows]
+        results = [None] * len(rows)
+        missing = {}
+
+        with self._lock:
+            for i, mask in enumerate(masks):
+                row = self._table_index.get(mask)
+                if row is not None:
+                    self.table_hits += 1
+                    entry = (self.classes[self._table_codes[row]], self._table_probs[row])
+                else:
+                    entry = self._cache.get(mask)
+                    if entry is not None:
+                        self.cache_hits += 1
+                        self._cache.move_to_end(mask)
+                    else:
+                        self.misses += 1
+                        missing.setdefault(mask, []).append(i)
+                results[i] = entry
+
+        if missing:
+            labels, probs = self._score([rows[positions[0]] for positions in missing.values()])
+            with self._lock:
+                for (mask, positions), label, row in zip(missing.items(), labels, probs):
+                    # Own copy, so an entry doesn't keep the whole batch matrix alive
+                    entry = (label, row.copy())
+                    for i in positions:
+                        results[i] = entry
+                    if mask not in self._cache:
+                        self._cache_bytes += _entry_bytes(mask, entry)
+                    self._cache[mask] = entry
+                    self._cache.move_to_end(mask)
+                while len(self._cache) > self.cache_size:
+                    evicted = self._cache.popitem(last=False)
+                    self._cache_bytes -= _entry_bytes(*evicted)
+
+        return results
+
+    def predict(self, values):
+        return self.predict_many([values])[0]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.table_hits + self.cache_hits + self.misses
+            hits = self.table_hits + self.cache_hits
+            return {
+                "backend": self.backend,
+                "lookups": lookups,
+                "hits": hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else None,
+                "table_hits": self.table_hits,
+                "cache_hits": self.cache_hits,
+                "table_entries": len(self._table_index),
+                "table_bytes": self._table_bytes,
+                "cache_entries": len(self._cache),
+                "cache_size": self.cache_size,
+                "cache_bytes": self._cache_bytes + sys.getsizeof(self._cache),
+                "model_bytes": self.model.nbytes,
+            }
+
+
+def build_symptom_predictor(clf, le, symptoms):
+    """Predictor configured from SYMPTOM_CACHE_SIZE / SYMPTOM_PRECOMPUTE."""
+    predictor = SymptomPredictor(clf, le, symptoms, cache_size=int(os.environ.get("SYMPTOM_CACHE_SIZE", 4096)))
+    if os.environ.get("SYMPTOM_PRECOMPUTE", "1") != "0":
+        entries = predictor.precompute(frontend_vectors(predictor.symptoms))
+        print(f"✅ Precomputed {entries} frontend symptom combinations")
+    return predictor
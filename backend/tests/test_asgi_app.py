@@ -0,0 +1,131 @@
+import io
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+from starlette.testclient import TestClient
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import app as backend_app  # noqa: E402
+import asgi_app  # noqa: E402
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    async def no_llm_async(prompt, model_name="gemini-pro"):
+        return None
+
+    # Both modes fall back to the canned messages
+    monkeypatch.setattr(backend_app, "call_gemini_api", lambda prompt, model_name="gemini-pro": None)
+    monkeypatch.setattr(backend_app, "call_gemini_api_async", no_llm_async)
+    return backend_app.app.test_client(), TestClient(asgi_app.app)
+
+
+@pytest.mark.parametrize("path, kwargs", [
+    ("/predict_symptoms", {"json": {"symptoms": {"feeling_sad": "yes", "sleep_problems": 1}}}),
+    ("/predict_symptoms", {"json": {}}),
+    ("/predict_text", {"json": {"statement": "I feel sad and hopeless"}}),
+    ("/predict_text", {"data": {"statement": "panic and fear"}}),
+    ("/predict_text", {"json": {}}),
+    ("/predict_multimodal", {"json": {"statement": "I am so stressed and anxious"}}),
+    ("/predict_multimodal", {"data": {"statement": "  "}}),
+    ("/chat", {"json": {"message": "hello"}}),
+    # Malformed input must fail the same way in both modes
+    ("/predict_symptoms", {"content": b"", "headers": {"Content-Type": "text/plain"}}),
+    ("/predict_symptoms", {"content": b"{bad", "headers": {"Content-Type": "text/plain"}}),
+    ("/predict_symptoms", {"content": b'{"sadness": "yes"}', "headers": {"Content-Type": "text/plain"}}),
+    ("/predict_text", {"content": b"{bad", "headers": {"Content-Type": "application/json"}}),
+    ("/predict_text", {"json": ["x"]}),
+    ("/predict_text", {"content": b"hi", "headers": {"Content-Type": "text/plain"}}),
+    ("/predict_text", {"content": b'{"statement": "sad"}', "headers": {"Content-Type": "application/vnd.api+json"}}),
+    ("/predict_multimodal", {"content": b"{bad", "headers": {"Content-Type": "application/json"}}),
+    ("/predict_multimodal", {"json": ["x"]}),
+    ("/predict_multimodal", {"json": {"statement": 5}}),
+    ("/chat", {"content": b'{"message": "hi"}', "headers": {"Content-Type": "text/plain"}}),
+    ("/chat", {"content": b"{bad", "headers": {"Content-Type": "application/json"}}),
+    ("/chat", {"json": ["x"]}),
+])
+def test_async_routes_match_flask_views(clients, path, kwargs):
+    flask_client, asgi_client = clients
+
+    expected = flask_client.post(path, **flask_kwargs(kwargs))
+    response = asgi_client.post(path, **kwargs)
+
+    assert response.status_code == expected.status_code
+    # Tracebacks differ between the two stacks; everything else must match
+    assert without_trace(response.json()) == without_trace(expected.get_json())
+
+
+def flask_kwargs(kwargs):
+    """httpx-style raw body arguments -> Flask test client arguments."""
+    if "content" not in kwargs:
+        return kwargs
+    return {"data": kwargs["content"], "content_type": kwargs["headers"]["Content-Type"]}
+
+
+def without_trace(body):
+    return {k: v for k, v in body.items() if k != "trace"}
+
+
+class FakeDeepFace:
+    @staticmethod
+    def analyze(**kwargs):
+        return [{"dominant_emotion": "sad"}]
+
+
+def png_bytes():
+    _, buffer = cv2.imencode(".png", np.zeros((8, 8, 3), np.uint8))
+    return buffer.tobytes()
+
+
+def missing_deepface():
+    raise ImportError("No module named 'deepface'")
+
+
+@pytest.mark.parametrize("load_deepface, image", [
+    (lambda: FakeDeepFace, png_bytes()),
+    (missing_deepface, png_bytes()),
+    (lambda: FakeDeepFace, b"not an image"),
+    (lambda: FakeDeepFace, None),
+])
+def test_async_emotion_route_matches_flask_view(clients, monkeypatch, load_deepface, image):
+    flask_client, asgi_client = clients
+    monkeypatch.setattr(backend_app, "load_deepface", load_deepface)
+
+    expected = flask_client.post(
+        "/predict_emotion",
+        data={} if image is None else {"image": (io.BytesIO(image), "frame.png")},
+        content_type="multipart/form-data",
+    )
+    response = asgi_client.post(
+        "/predict_emotion",
+        files={} if image is None else {"image": ("frame.png", image, "image/png")},
+        data={"source": "webcam"},
+    )
+
+    assert response.status_code == expected.status_code
+    assert response.json() == expected.get_json()
+
+
+def test_other_routes_are_served_by_flask(clients):
+    _, asgi_client = clients
+
+    response = asgi_client.get("/")
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "Flask backend is running successfully!"}
+
+
+def test_async_routes_echo_origin_for_credentialed_cors(clients):
+    _, asgi_client = clients
+
+    response = asgi_client.post(
+        "/chat", json={"message": "hello"}, headers={"Origin": "http://localhost:3000"}
+    )
+
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert response.headers["access-control-allow-credentials"] == "true"
@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+from multiprocessing.util import Finalize
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import app as backend_app  # noqa: E402
+from inference_server import (  # noqa: E402
+    InferenceClient,
+    InferenceServer,
+    check_private_dir,
+    load_models,
+)
+
+AUTHKEY = b"test-key"
+
+
+@pytest.fixture(scope="module")
+def models():
+    return load_models()
+
+
+@pytest.fixture
+def socket_dir():
+    # mkdtemp gives a short 0700 path; AF_UNIX paths are limited to ~100 bytes
+    path = tempfile.mkdtemp(prefix="mc-inf-")
+    yield path
+    # Server threads outlive the test; remove the dir after their Listener
+    # finalizers (exitpriority 0) have unlinked the sockets at exit
+    Finalize(None, shutil.rmtree, args=(path,), kwargs={"ignore_errors": True}, exitpriority=-1)
+
+
+def start_server(address, models):
+    server = InferenceServer(address, models)
+    threading.Thread(target=server.serve_forever, args=(AUTHKEY,), daemon=True).start()
+    client = InferenceClient(address, authkey=AUTHKEY)
+    for _ in range(100):
+        if client.available():
+            return server, client
+        time.sleep(0.05)
+    raise RuntimeError("inference server did not start")
+
+
+def test_client_matches_in_process_predictions(socket_dir, models):
+    _, client = start_server(os.path.join(socket_dir, "inference.sock"), models)
+    values = [0] * len(models["symptoms"])
+    values[0] = values[5] = 1
+
+    label, _ = models["symptom_predictor"].predict(values)
+    assert client.predict_symptoms(values) == label
+
+    text_label, confidence = client.predict_text("I feel sad and hopeless")
+    vector = models["vectorizer"].transform(["i feel sad and hopeless"])
+    assert text_label == models["text_model"].predict(vector)[0]
+    assert confidence == pytest.approx(models["text_model"].predict_proba(vector).max())
+
+
+def test_server_models_do_not_keep_the_pickled_forest(models):
+    assert set(models) == {"symptom_predictor", "text_model", "vectorizer", "symptoms"}
+    assert models["symptom_predictor"].backend == "flat_forest"
+
+
+def test_wrong_authkey_is_rejected(socket_dir, models):
+    address = os.path.join(socket_dir, "inference.sock")
+    start_server(address, models)
+
+    assert not InferenceClient(address, authkey=b"wrong-key").available()
+
+
+def test_authkey_is_required(socket_dir, models):
+    with pytest.raises(ValueError):
+        InferenceClient(os.path.join(socket_dir, "inference.sock"), authkey=b"")
+    with pytest.raises(ValueError):
+        InferenceServer(os.path.join(socket_dir, "inference.sock"), models).serve_forever(None)
+
+
+def test_second_server_refuses_a_live_socket(socket_dir, models):
+    address = os.path.join(socket_dir, "inference.sock")
+    start_server(address, models)
+
+    with pytest.raises(RuntimeError, match="already listening"):
+        InferenceServer(address, models).serve_forever(AUTHKEY)
+
+
+def test_shared_socket_dir_is_refused(socket_dir, models):
+    os.chmod(socket_dir, 0o755)
+    address = os.path.join(socket_dir, "inference.sock")
+
+    with pytest.raises(PermissionError):
+        check_private_dir(socket_dir)
+    with pytest.raises(PermissionError):
+        InferenceServer(address, models).serve_forever(AUTHKEY)
+    assert not InferenceClient(address, authkey=AUTHKEY).available()
+
+
+def test_predict_symptoms_is_503_when_server_is_down(socket_dir, monkeypatch):
+    client = InferenceClient(os.path.join(socket_dir, "missing.sock"), authkey=AUTHKEY)
+    monkeypatch.setattr(backend_app, "inference_client", client)
+
+    response = backend_app.app.test_client().post("/predict_symptoms", json={"sadness": "yes"})
+
+    assert response.status_code == 503
+    assert response.get_json() == backend_app.SYMPTOMS_UNAVAILABLE
@@ -0,0 +1,98 @@
+import os
+import sys
+
+import joblib
+import numpy as np
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from online_learning import FeedbackLog, OnlineTextTrainer  # noqa: E402
+
+STATEMENT = "Work pressure is overwhelming me lately"
+
+
+@pytest.fixture(scope="module")
+def text_model():
+    model = joblib.load(os.path.join(BACKEND_DIR, "logistic_regression_model.pkl"))
+    vectorizer = joblib.load(os.path.join(BACKEND_DIR, "tfidf_vectorizer.pkl"))
+    return model, vectorizer
+
+
+@pytest.fixture
+def feedback_log(tmp_path):
+    return FeedbackLog(str(tmp_path / "feedback_log.jsonl"))
+
+
+def make_trainer(text_model, feedback_log, published, batch_size=32):
+    model, vectorizer = text_model
+    return OnlineTextTrainer(model, vectorizer, feedback_log, published.append, batch_size=batch_size)
+
+
+def predict(model, vectorizer, statement):
+    vector = vectorizer.transform([statement.lower()])
+    return model.predict(vector)[0], model.predict_proba(vector)[0]
+
+
+def test_feedback_changes_predictions(text_model, feedback_log):
+    model, vectorizer = text_model
+    before, _ = predict(model, vectorizer, STATEMENT)
+    assert before != "Stress"
+    published = []
+    trainer = make_trainer(text_model, feedback_log, published)
+
+    for _ in range(32):
+        feedback_log.append({"statement": STATEMENT, "label": "Stress"})
+    assert trainer.run_once() == 32
+
+    (updated,) = published
+    label, proba = predict(updated, vectorizer, STATEMENT)
+    assert label == "Stress"
+    assert proba.sum() == pytest.approx(1.0)
+    assert type(updated) is type(model)
+    # The served model is untouched until the swap
+    assert predict(model, vectorizer, STATEMENT)[0] == before
+
+
+def test_only_full_batches_are_applied(text_model, feedback_log):
+    published = []
+    trainer = make_trainer(text_model, feedback_log, published, batch_size=4)
+
+    for _ in range(3):
+        feedback_log.append({"statement": STATEMENT, "label": "Stress"})
+    feedback_log.append({"statement": STATEMENT, "label": "Not a label"})
+    assert trainer.run_once() == 0
+    assert published == []
+    assert trainer.status()["pending_feedback"] == 3
+
+    feedback_log.append({"statement": STATEMENT, "label": "Stress"})
+    assert trainer.run_once() == 4
+    assert len(published) == 1
+    assert trainer.status()["model_version"] == 1
+    assert trainer.status()["pending_feedback"] == 0
+
+
+def test_status_does_not_read_the_log(text_model, feedback_log):
+    trainer = make_trainer(text_model, feedback_log, [])
+
+    feedback_log.append({"statement": STATEMENT, "label": "Stress"})
+
+    assert trainer.status()["pending_feedback"] == 0
+    trainer.run_once()
+    assert trainer.status()["pending_feedback"] == 1
+
+
+def test_version_and_weights_depend_only_on_the_log(text_model, feedback_log):
+    eager, lazy = [], []
+    eager_trainer = make_trainer(text_model, feedback_log, eager, batch_size=4)
+    lazy_trainer = make_trainer(text_model, feedback_log, lazy, batch_size=4)
+    labels = ["Stress", "Anxiety", "Depression", "Normal"]
+
+    for i in range(10):
+        feedback_log.append({"statement": f"{STATEMENT} {i}", "label": labels[i % len(labels)]})
+        eager_trainer.run_once()
+    lazy_trainer.run_once()
+
+    assert eager_trainer.version == lazy_trainer.version == 2
+    np.testing.assert_array_equal(eager[-1].coef_, lazy[-1].coef_)
@@ -0,0 +1,117 @@
+import io
+import os
+import sys
+import json
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import app as backend_app  # noqa: E402
+import risk_scoring  # noqa: E402
+
+SAMPLE_CSV = os.path.join(BACKEND_DIR, "anxiety_depression_data.csv")
+
+
+@pytest.fixture
+def client():
+    return backend_app.app.test_client()
+
+
+def make_csv(copies):
+    with open(SAMPLE_CSV, "rb") as f:
+        header, body = f.read().split(b"\n", 1)
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    return header + b"\n" + body * copies, body.count(b"\n") * copies
+
+
+def parse_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_multipart_upload_spanning_many_chunks_is_fully_scored(client):
+    data, n_rows = make_csv(copies=20)
+
+    response = client.post(
+        "/score_risk_bulk?chunksize=1000",
+        data={"file": (io.BytesIO(data), "records.csv")},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 200
+    lines = parse_ndjson(response)
+    rows, summary = lines[:-1], lines[-1]
+    assert all(line.get("error") is None for line in lines)
+    assert len(rows) == n_rows
+    assert [r["row"] for r in rows] == list(range(n_rows))
+    assert summary["summary"]["rows"] == n_rows
+    assert summary["summary"]["chunks"] == -(-n_rows // 1000)
+
+
+def test_raw_csv_body_streams_csv(client):
+    data, n_rows = make_csv(copies=3)
+
+    response = client.post("/score_risk_bulk?format=csv&chunksize=500", data=data, content_type="text/csv")
+
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0].startswith("row,predicted_condition,risk_score")
+    assert len(lines) == n_rows + 1
+
+
+def test_missing_columns_is_a_400(client):
+    response = client.post("/score_risk_bulk", data=b"a,b\n1,2\n", content_type="text/csv")
+
+    assert response.status_code == 400
+    assert "Missing required columns" in response.get_json()["error"]
+
+
+def test_rows_without_screening_scores_get_an_error_not_a_score(client):
+    with open(SAMPLE_CSV, "rb") as f:
+        header, body = f.read().split(b"\n", 1)
+    good = body.split(b"\n", 1)[0]
+    columns = header.decode().split(",")
+    bad = dict(zip(columns, good.decode().split(",")))
+    bad["Anxiety_Score"] = "abc"
+    bad["Depression_Score"] = ""
+    data = header + b"\n" + good + b"\n" + ",".join(bad[c] for c in columns).encode() + b"\n"
+
+    response = client.post("/score_risk_bulk", data=data, content_type="text/csv")
+
+    ok_row, bad_row, summary = parse_ndjson(response)
+    assert ok_row["error"] is None
+    assert ok_row["predicted_condition"] is not None
+    assert bad_row["error"] == "Missing or non-numeric Anxiety_Score, Depression_Score"
+    assert bad_row["predicted_condition"] is None
+    assert bad_row["risk_score"] is None
+    assert summary["summary"]["rows_invalid"] == 1
+
+
+def test_predicted_condition_follows_the_screening_rule(client):
+    data, n_rows = make_csv(copies=1)
+
+    response = client.post("/score_risk_bulk", data=data, content_type="text/csv")
+
+    rows = parse_ndjson(response)[:-1]
+    expected = risk_scoring.assign_condition(risk_scoring.read_records(io.BytesIO(data)))
+    assert [r["predicted_condition"] for r in rows] == list(expected)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_stream_that_fails_midway_ends_with_an_error_record(client, fmt):
+    data, n_rows = make_csv(copies=2)
+    # A row with extra fields makes the parser fail on a later chunk
+    data += b"1,2,3" + b",9" * 40 + b"\n"
+
+    response = client.post(f"/score_risk_bulk?format={fmt}&chunksize=500", data=data, content_type="text/csv")
+
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    if fmt == "csv":
+        assert lines[-1].startswith(f"{n_rows - n_rows % 500},")
+        assert "Scoring stopped after" in lines[-1]
+    else:
+        last = json.loads(lines[-1])
+        assert "rows_scored" in last and last["error"]
@@ -0,0 +1,144 @@
+import gc
+import os
+import sys
+import tracemalloc
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from symptom_inference import (  # noqa: E402
+    FlatForest,
+    SymptomPredictor,
+    encode_mask,
+    frontend_vectors,
+)
+
+
+@pytest.fixture(scope="module")
+def model():
+    header = pd.read_csv(os.path.join(BACKEND_DIR, "mental_symptoms_illness.csv"), nrows=0)
+    symptoms = [col for col in header.columns if col != "Disease"]
+    clf = joblib.load(os.path.join(BACKEND_DIR, "model.pkl"))
+    le = joblib.load(os.path.join(BACKEND_DIR, "label_encoder.pkl"))
+    return clf, le, symptoms
+
+
+def sample_vectors(symptoms, n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.random((n, len(symptoms))) < 0.1).astype(int)
+
+
+def test_flat_forest_matches_sklearn_probabilities(model):
+    clf, _, symptoms = model
+    X = np.vstack([list(frontend_vectors(symptoms)), sample_vectors(symptoms)])
+
+    flat = FlatForest.from_estimator(clf, symptoms)
+
+    expected = clf.predict_proba(pd.DataFrame(X, columns=symptoms))
+    np.testing.assert_allclose(flat.predict_proba(X), expected, rtol=0, atol=1e-12)
+
+
+def test_flat_forest_follows_caller_column_order(model):
+    clf, _, symptoms = model
+    X = sample_vectors(symptoms, n=50)
+    reversed_columns = symptoms[::-1]
+
+    flat = FlatForest.from_estimator(clf, reversed_columns)
+
+    expected = clf.predict_proba(pd.DataFrame(X, columns=symptoms))
+    np.testing.assert_allclose(flat.predict_proba(X[:, ::-1]), expected, rtol=0, atol=1e-12)
+
+
+def test_encode_mask_sets_one_bit_per_symptom():
+    assert encode_mask([0, 0, 0]) == 0
+    assert encode_mask([1, 0, 1]) == 0b101
+    assert encode_mask([0] * 99 + [1]) == 1 << 99
+
+
+def test_predictions_match_estimator_labels(model):
+    clf, le, symptoms = model
+    X = sample_vectors(symptoms, n=200)
+    predictor = SymptomPredictor(clf, le, symptoms)
+
+    labels = [label for label, _ in predictor.predict_many(list(X))]
+
+    expected = le.inverse_transform(clf.predict(pd.DataFrame(X, columns=symptoms)))
+    assert labels == [str(label) for label in expected]
+
+
+def test_precomputed_frontend_table_serves_form_inputs(model):
+    clf, le, symptoms = model
+    predictor = SymptomPredictor(clf, le, symptoms)
+    vectors = list(frontend_vectors(symptoms))
+
+    entries = predictor.precompute(vectors)
+    for values in vectors[:50]:
+        predictor.predict(values)
+
+    stats = predictor.stats()
+    assert entries == len({encode_mask(values) for values in vectors})
+    assert stats["table_hits"] == 50
+    assert stats["misses"] == 0
+    assert stats["hit_rate"] == 1.0
+    assert stats["table_bytes"] > 0
+
+
+def test_table_bytes_matches_traced_allocations(model):
+    clf, le, symptoms = model
+    predictor = SymptomPredictor(clf, le, symptoms)
+    vectors = list(frontend_vectors(symptoms))
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        predictor.precompute(vectors)
+        gc.collect()
+        kept = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    assert predictor.stats()["table_bytes"] == pytest.approx(kept, rel=0.05)
+
+
+def test_flattened_predictor_does_not_keep_the_estimator(model):
+    clf, le, symptoms = model
+    predictor = SymptomPredictor(clf, le, symptoms)
+
+    assert predictor.backend == "flat_forest"
+    held = list(vars(predictor).values()) + list(vars(predictor.model).values())
+    assert not any(value is clf for value in held)
+
+
+def test_lru_is_bounded_and_counts_hits(model):
+    clf, le, symptoms = model
+    predictor = SymptomPredictor(clf, le, symptoms, cache_size=3)
+    X = list(sample_vectors(symptoms, n=5, seed=1))
+
+    for values in X:
+        predictor.predict(values)
+    first = predictor.predict(X[-1])
+    again = predictor.predict(X[-1])
+
+    stats = predictor.stats()
+    assert first is again
+    assert stats["cache_entries"] == 3
+    assert stats["misses"] == 5
+    assert stats["cache_hits"] == 2
+    assert stats["hit_rate"] == pytest.approx(2 / 7)
+
+
+def test_batch_scores_duplicate_misses_once(model):
+    clf, le, symptoms = model
+    predictor = SymptomPredictor(clf, le, symptoms)
+    values = list(sample_vectors(symptoms, n=1, seed=2)[0])
+
+    first, second = predictor.predict_many([values, values])
+
+    assert first is second
+    assert predictor.stats()["cache_entries"] == 1
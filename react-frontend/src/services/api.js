@@ -80,6 +80,20 @@ export const api = {
     return response.json(); // ✅ Backend returns JSON
   },
 
+  /**
+   * Adaptive questionnaire step: top conditions + next symptom to ask
+   */
+  adaptiveQuestionnaire: async (answers, topK = 3) => {
+    const response = await fetch(`${API_BASE_URL}/adaptive_questionnaire`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ answers, top_k: topK }),
+      credentials: 'include'
+    });
+
+    return response.json();
+  },
+
   /**
    * Predict from text statement
    */